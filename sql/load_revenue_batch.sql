@@ -0,0 +1,74 @@
+-- Bulk load of one upload batch into revenue_data in a single statement.
+--
+-- Columns arrive as parallel text arrays instead of one JSON object per row, and are
+-- converted with revenue_data's own column types, so the table schema is not
+-- repeated here. The app clears the session before uploading, so this is a plain
+-- insert with no conflict handling. Returns the number of rows inserted.
+--
+-- Each batch is checkpointed in upload_checkpoints in the same transaction, keyed by
+-- the upload's job id and the batch's row range. Sending the same batch again (e.g.
+-- a retry after a lost response) inserts nothing, so retries are idempotent. Job ids
+-- are unique per upload, so old checkpoints never match and can be pruned freely;
+-- the app deletes a session's checkpoints along with its rows.
+--
+-- The app does not read these checkpoints back: which rows an interrupted upload
+-- still needs is only kept in the app server's memory, so resuming does not survive
+-- a restart of the app server. Uploading again then starts from scratch.
+
+create table if not exists upload_checkpoints (
+    session_id text not null,
+    job_id text not null,
+    first_row integer not null,
+    row_count integer not null,
+    loaded_at timestamptz not null default now(),
+    primary key (session_id, job_id, first_row, row_count)
+);
+
+-- Replaces the earlier signature without checkpoints
+drop function if exists load_revenue_batch(text, text[], text[], text[], text[]);
+
+create or replace function load_revenue_batch(
+    p_session_id text,
+    p_job_id text,
+    p_first_row integer,
+    p_dates text[],
+    p_ids text[],
+    p_revenue text[],
+    p_users text[]
+)
+returns integer
+language plpgsql
+as $$
+declare
+    inserted integer;
+begin
+    if coalesce(cardinality(p_dates), 0) = 0 then
+        return 0;
+    end if;
+
+    insert into upload_checkpoints (session_id, job_id, first_row, row_count)
+    values (p_session_id, p_job_id, p_first_row, cardinality(p_dates))
+    on conflict do nothing;
+    if not found then
+        -- Already loaded by an earlier attempt
+        return 0;
+    end if;
+
+    insert into revenue_data (session_id, transaction_date, transaction_id, revenue, user_id)
+    select r.session_id, r.transaction_date, r.transaction_id, r.revenue, r.user_id
+    from unnest(p_dates, p_ids, p_revenue, p_users) as t(transaction_date, transaction_id, revenue, user_id)
+    cross join lateral jsonb_populate_record(null::revenue_data, jsonb_build_object(
+        'session_id', p_session_id,
+        'transaction_date', t.transaction_date,
+        'transaction_id', t.transaction_id,
+        'revenue', t.revenue,
+        'user_id', t.user_id
+    )) as r;
+
+    get diagnostics inserted = row_count;
+    return inserted;
+end;
+$$;
+
+grant select, insert, delete on upload_checkpoints to anon, authenticated;
+grant execute on function load_revenue_batch(text, text, integer, text[], text[], text[], text[]) to anon, authenticated;
@@ -0,0 +1,106 @@
+-- Everything the Visualize tab needs for one period in a single round trip.
+--
+-- Returns a JSON object keyed like the app's period_data dict, each entry holding the
+-- view's rows for the session and date range, in view order.
+-- p_period is the period selector value: 'Monthly', 'Weekly' or 'Daily'.
+-- p_columns maps each entry to the columns to return (the client's VIEWS manifest);
+-- entries missing from it are skipped.
+-- p_format 'csv' returns each entry as a view_csv document (sql/view_csv.sql) instead
+-- of a JSON array of rows.
+-- A null p_start or p_end leaves that side of the range open.
+
+-- Replaces the earlier signatures
+drop function if exists period_snapshot(text, text, date, date);
+drop function if exists period_snapshot(text, text, jsonb, date, date);
+
+create or replace function period_snapshot(
+    p_session_id text,
+    p_period text,
+    p_columns jsonb,
+    p_start date default null,
+    p_end date default null,
+    p_format text default 'json'
+)
+returns jsonb
+language plpgsql
+stable
+as $$
+declare
+    -- entry -> [view, date column, order by]
+    views jsonb := case p_period
+        when 'Monthly' then '{
+            "results": ["mau_view", "month", "month"],
+            "revenue_results": ["mrr_view", "month", "month"],
+            "retention_results": ["monthly_retention_view", "month", "month"],
+            "revenue_retention_results": ["monthly_revenue_retention_view", "month", "month"],
+            "quick_ratio_results": ["monthly_quick_ratio_view", "month", "month"],
+            "revenue_quick_ratio_results": ["monthly_revenue_quick_ratio_view", "month", "month"],
+            "cohorts_results": ["monthly_cohorts_view", "first_month", "first_month, active_month"]
+        }'::jsonb
+        when 'Weekly' then '{
+            "results": ["wau_view", "week", "week"],
+            "revenue_results": ["wrr_view", "week", "week"],
+            "retention_results": ["weekly_retention_view", "week", "week"],
+            "revenue_retention_results": ["weekly_revenue_retention_view", "week", "week"],
+            "quick_ratio_results": ["weekly_quick_ratio_view", "week", "week"],
+            "revenue_quick_ratio_results": ["weekly_revenue_quick_ratio_view", "week", "week"],
+            "cohorts_results": ["weekly_cohorts_view", "first_week", "first_week, active_week"]
+        }'::jsonb
+        when 'Daily' then '{
+            "results": ["dau_view", "day", "day"],
+            "revenue_results": ["drr_view", "day", "day"],
+            "retention_results": ["daily_retention_view", "day", "day"],
+            "revenue_retention_results": ["daily_revenue_retention_view", "day", "day"],
+            "quick_ratio_results": ["daily_quick_ratio_view", "day", "day"],
+            "revenue_quick_ratio_results": ["daily_revenue_quick_ratio_view", "day", "day"],
+            "cohorts_results": ["daily_cohorts_view", "first_dt", "first_dt, active_day"]
+        }'::jsonb
+    end;
+    entry record;
+    projection text;
+    rows jsonb;
+    snapshot jsonb := '{}'::jsonb;
+begin
+    if views is null then
+        raise exception 'Unknown period: %', p_period;
+    end if;
+
+    for entry in select key, value from jsonb_each(views) where p_columns ? key loop
+        if p_format = 'csv' then
+            rows := to_jsonb(view_csv(
+                p_session_id,
+                entry.value->>0,
+                array(select jsonb_array_elements_text(p_columns->entry.key)),
+                entry.value->>1,
+                string_to_array(entry.value->>2, ', '),
+                false,
+                p_start,
+                p_end
+            ));
+            snapshot := snapshot || jsonb_build_object(entry.key, rows);
+            continue;
+        end if;
+
+        select string_agg(format('%L, t.%I', col, col), ', ')
+        into projection
+        from jsonb_array_elements_text(p_columns->entry.key) as col;
+
+        execute format(
+            'select coalesce(jsonb_agg(jsonb_build_object(%s) order by %s), ''[]''::jsonb)
+             from %I t
+             where t.session_id = $1
+               and ($2::date is null or t.%I >= $2)
+               and ($3::date is null or t.%I <= $3)',
+            projection, entry.value->>2, entry.value->>0, entry.value->>1, entry.value->>1
+        )
+        into rows
+        using p_session_id, p_start, p_end;
+
+        snapshot := snapshot || jsonb_build_object(entry.key, rows);
+    end loop;
+
+    return snapshot;
+end;
+$$;
+
+grant execute on function period_snapshot(text, text, jsonb, date, date, text) to anon, authenticated;
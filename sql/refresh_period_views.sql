@@ -0,0 +1,48 @@
+-- Synchronous refresh of one granularity's materialized views.
+--
+-- p_granularity is 'daily', 'weekly' or 'monthly', as in refresh_trigger.view_name.
+-- The views are refreshed in this call's transaction, so when it returns they hold
+-- the uploaded rows: the response itself is the completion signal the app waits on
+-- (SupabaseBackend.refresh_granularity). Only those of the granularity's views that
+-- are materialized are refreshed; the others are computed on read. Materialized views
+-- hold every session's rows, so a refresh covers all sessions.
+-- Returns the number of views refreshed.
+-- Runs as the views' owner, since only the owner may refresh a materialized view.
+
+create or replace function refresh_period_views(
+    p_granularity text
+)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    view_name text;
+    refreshed integer := 0;
+begin
+    if p_granularity not in ('daily', 'weekly', 'monthly') then
+        raise exception 'Unknown granularity: %', p_granularity using errcode = '22023';
+    end if;
+
+    for view_name in
+        select matviewname
+        from pg_matviews
+        where schemaname = 'public'
+          and matviewname = any(array[
+              p_granularity || '_retention_view',
+              p_granularity || '_revenue_retention_view',
+              p_granularity || '_quick_ratio_view',
+              p_granularity || '_revenue_quick_ratio_view',
+              p_granularity || '_cohorts_view'
+          ])
+    loop
+        execute format('refresh materialized view %I', view_name);
+        refreshed := refreshed + 1;
+    end loop;
+
+    return refreshed;
+end;
+$$;
+
+grant execute on function refresh_period_views(text) to anon, authenticated;
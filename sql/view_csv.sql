@@ -0,0 +1,53 @@
+-- A view's rows for a session as one CSV document, for the columnar read path.
+--
+-- Returns a header line of p_columns followed by one line per row, ordered by p_order
+-- (descending when p_desc). Every value is quoted with embedded quotes doubled; nulls
+-- are left empty. A null p_start or p_end leaves that side of the range open.
+-- Runs with the caller's privileges, so it reads nothing the caller could not select.
+
+create or replace function view_csv(
+    p_session_id text,
+    p_view text,
+    p_columns text[],
+    p_date_column text,
+    p_order text[],
+    p_desc boolean default false,
+    p_start date default null,
+    p_end date default null
+)
+returns text
+language plpgsql
+stable
+as $$
+declare
+    fields text;
+    ordering text;
+    body text;
+begin
+    select string_agg(
+        format('coalesce(''"'' || replace(t.%I::text, ''"'', ''""'') || ''"'', '''')', col),
+        ' || '','' || '
+    )
+    into fields
+    from unnest(p_columns) as col;
+
+    select string_agg(format('t.%I %s', col, case when p_desc then 'desc' else 'asc' end), ', ')
+    into ordering
+    from unnest(p_order) as col;
+
+    execute format(
+        'select string_agg(%s, E''\n'' order by %s)
+         from %I t
+         where t.session_id = $1
+           and ($2::date is null or t.%I >= $2)
+           and ($3::date is null or t.%I <= $3)',
+        fields, ordering, p_view, p_date_column, p_date_column
+    )
+    into body
+    using p_session_id, p_start, p_end;
+
+    return array_to_string(p_columns, ',') || coalesce(E'\n' || body, '');
+end;
+$$;
+
+grant execute on function view_csv(text, text, text[], text, text[], boolean, date, date) to anon, authenticated;
@@ -2,32 +2,17 @@ import streamlit as st
 import pandas as pd
 import uuid
 from database import (
+    PERIOD_GRANULARITIES,
     create_revenue_table, 
-    get_daily_revenue, 
+    has_resumable_stream,
+    has_resumable_upload,
     clear_session_data, 
-    get_mau_data, 
-    get_wau_data,
-    get_dau_data,
-    get_mrr_data,
-    get_wrr_data,
-    get_monthly_retention_data,
-    get_weekly_retention_data,
-    get_daily_retention_data,
-    get_drr_data,
-    get_monthly_revenue_retention_data,
-    get_weekly_revenue_retention_data,
-    get_daily_revenue_retention_data,
-    get_monthly_quick_ratio_data,
-    get_monthly_revenue_quick_ratio_data,
-    get_weekly_revenue_quick_ratio_data,
-    get_weekly_quick_ratio_data,
-    get_daily_quick_ratio_data,
-    get_daily_revenue_quick_ratio_data,
-    get_monthly_cohorts_data,
-    get_initial_monthly_data,
-    get_weekly_cohorts_data,
-    get_daily_cohorts_data,
-    refresh_views
+    get_period_data,
+    get_refresh_job,
+    is_period_refreshed,
+    start_prefetch,
+    start_refresh,
+    stream_revenue_table
 )
 from visuals.mau import plot_mau
 from visuals.wau import plot_wau
@@ -44,6 +29,22 @@ import time
 from metrics import MetricsLogger
 from logger import ErrorLogger
 from st_supabase_connection import SupabaseConnection
+from storage import STORAGE_BACKEND
+from upload import (
+    REQUIRED_COLUMNS,
+    UPLOAD_TYPES,
+    csv_size,
+    estimate_rows,
+    iter_csv_chunks,
+    missing_columns,
+    open_upload,
+    preview,
+    preview_head,
+    read_head,
+    read_upload,
+    should_stream,
+    stream_fingerprint
+)
 
 # Page config must be the first Streamlit command
 st.set_page_config(
@@ -56,6 +57,13 @@ def load_css():
     with open('src/styles/main.css') as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
+@st.fragment(run_every=0.5)
+def show_refresh_status(period):
+    """Poll the background view refresh, rerunning the app once the period's views are ready"""
+    if is_period_refreshed(period):
+        st.rerun()
+    st.info(f"Preparing {period.lower()} views ({get_refresh_job().status})...")
+
 # Load font and CSS after page config
 st.markdown("""
     <link href="https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;700&display=swap" rel="stylesheet">
@@ -66,8 +74,8 @@ load_css()
 if 'session_id' not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
 
-# Constants
-MAX_FILE_SIZE_MB = 10
+# Constants (Streamlit's own limit is server.maxUploadSize in .streamlit/config.toml)
+MAX_FILE_SIZE_MB = 1024
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
 # Add credit text as footer
@@ -94,8 +102,8 @@ tab1, tab2, tab3 = st.tabs([
     "3️⃣ Go Further"
 ])
 
-# Initialize loggers
-supabase = st.connection("supabase", type=SupabaseConnection)
+# Initialize loggers (metrics are only stored when running against Supabase)
+supabase = st.connection("supabase", type=SupabaseConnection) if STORAGE_BACKEND == "supabase" else None
 metrics = MetricsLogger(supabase)
 error_logger = ErrorLogger(supabase)
 
@@ -109,7 +117,7 @@ with tab1:
     with main_col1:
         st.markdown("##### ℹ️ Instructions")
         st.markdown("""
-            - Maximum file size: 10MB
+            - Maximum file size: 1GB, or compress the CSV as .csv.gz, .zip or .zst
             - Required CSV columns: date, transaction id, revenue, user id
             - Filters only apply after clicking "Apply filters"
             - See example file below to know the expected format, or to test the app with it
@@ -133,55 +141,59 @@ with tab1:
         st.markdown("##### 📂 Choose CSV file")
         uploaded_file = st.file_uploader(
             "",  # Empty label since we're using the header above
-            type=['csv'],
+            type=UPLOAD_TYPES,
             label_visibility="collapsed"
         )
         
         if uploaded_file is not None:
             # Check file size
-            file_size = len(uploaded_file.getvalue())
+            file_size = uploaded_file.size
             if file_size > MAX_FILE_SIZE_BYTES:
                 st.error(f"File size exceeds {MAX_FILE_SIZE_MB}MB limit. Please upload a smaller file.")
                 metrics.log_upload(file_size, 0, False, "File size exceeds limit")
             else:
                 try:
                     start_time = time.time()
-                    df = pd.read_csv(uploaded_file)
-                    
-                    # Clean up date format - remove time if it's all zeros
-                    if 'date' in df.columns:
-                        df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-                        if df['date'].str.contains('00:00:00').all():
-                            df['date'] = df['date'].str.replace(' 00:00:00', '')
                     
-                    st.markdown("##### 👀 Data Preview:")
-                    st.dataframe(
-                        df.head(),
-                        hide_index=True,
-                        column_config={
-                            "date": st.column_config.TextColumn("date"),
-                            "id": st.column_config.TextColumn("id"),
-                            "revenue": st.column_config.NumberColumn(
-                                "revenue",
-                                format="$%d"
-                            ),
-                            "user_id": st.column_config.TextColumn("user_id"),
-                        },
-                        use_container_width=False,
-                    )
+                    # Large files, and compressed ones of unknown size, are parsed chunk by
+                    # chunk while they are stored
+                    streaming = should_stream(uploaded_file)
+                    head = read_head(open_upload(uploaded_file))
                     
-                    # Validate required columns
-                    required_columns = ['date', 'id', 'revenue', 'user_id']
-                    if not all(col in df.columns for col in required_columns):
-                        st.error("CSV must contain these columns: date, id, revenue, user_id")
+                    # Validate required columns from the header, before reading the body
+                    if missing_columns(head):
+                        st.error(f"CSV must contain these columns: {', '.join(REQUIRED_COLUMNS)}")
                     else:
+                        # Parsed once per file; reruns reuse the cached frame
+                        df = None if streaming else read_upload(uploaded_file)
+                        
+                        st.markdown("##### 👀 Data Preview:")
+                        st.dataframe(
+                            preview_head(head) if streaming else preview(df),
+                            hide_index=True,
+                            column_config={
+                                "date": st.column_config.TextColumn("date"),
+                                "id": st.column_config.TextColumn("id"),
+                                "revenue": st.column_config.NumberColumn(
+                                    "revenue",
+                                    format="$%d"
+                                ),
+                                "user_id": st.column_config.TextColumn("user_id"),
+                            },
+                            use_container_width=False,
+                        )
+                        
                         # Add buttons for actions
                         col1, col2, col3 = st.columns([0.3, 0.2, 0.65])
                         with col1:
                             if st.button("Generate Charts", use_container_width=True):
                                 try:
-                                    with st.spinner('Clearing existing data...'):
-                                        clear_session_data()
+                                    # Retrying an interrupted upload of the same file resumes it
+                                    fingerprint = stream_fingerprint(uploaded_file, head) if streaming else None
+                                    resumable = has_resumable_stream(fingerprint) if streaming else has_resumable_upload(df)
+                                    if not resumable:
+                                        with st.spinner('Clearing existing data...'):
+                                            clear_session_data()
                                     
                                     # Start timing
                                     start_time = time.time()
@@ -191,30 +203,38 @@ with tab1:
                                     status_text = st.empty()
                                     metrics_text = st.empty()
                                     
-                                    total_rows = len(df)
-                                    chunk_size = max(1, total_rows // 100) 
-                                    processed_rows = 0
+                                    # Streamed files are not counted up front, so estimate from the head
+                                    # (None when a compressed file does not record its size)
+                                    total_rows = estimate_rows(head, csv_size(uploaded_file)) if streaming else len(df)
                                     
-                                    # Process data in chunks
-                                    for i in range(0, total_rows, chunk_size):
-                                        chunk = df[i:i + chunk_size]
-                                        create_revenue_table(chunk)
-                                        
-                                        processed_rows += len(chunk)
+                                    def show_progress(processed_rows):
+                                        if total_rows is None:
+                                            status_text.text(f"Stored {processed_rows:,} rows")
+                                            return
                                         progress = min(processed_rows / total_rows, 1.0)
                                         progress_bar.progress(progress)
-                                        status_text.text(f"{progress:.1%} Stored {processed_rows:,} of {total_rows:,} rows")
+                                        approx = "~" if streaming else ""
+                                        status_text.text(f"{progress:.1%} Stored {processed_rows:,} of {approx}{total_rows:,} rows")
+                                    
+                                    # Store everything through one upload pipeline, updating as batches land
+                                    if streaming:
+                                        total_rows = stream_revenue_table(
+                                            iter_csv_chunks(open_upload(uploaded_file)), fingerprint, on_progress=show_progress
+                                        )
+                                    else:
+                                        create_revenue_table(df, on_progress=show_progress)
                                     
-                                    # Refresh views once after all data is loaded
-                                    with st.spinner('Loading views...'):
-                                        refresh_views(st.session_state.session_id)
+                                    # Refresh views in the background; the Visualize tab loads
+                                    # each period as soon as its views are ready
+                                    start_refresh()
                                     
                                     # Store success message in session state
                                     st.session_state.upload_success = f"Success! Stored {total_rows:,} records."
                                     
                                     # Set flags to automatically apply filters on initial data load
                                     st.session_state.filters_applied = True
-                                    st.session_state.period_data = get_initial_monthly_data()
+                                    st.session_state.period_data = None
+                                    st.session_state.pending_period = st.session_state.get('period_selector', "Monthly")
                                     
                                     # Force a rerun to show the visualization
                                     st.rerun()
@@ -295,65 +315,32 @@ with tab2:
         with col4:
             st.markdown("&nbsp;")  # Empty space to align with date inputs
             if st.button("Apply filters", key="period_apply", use_container_width=True):
-                # Get data based on selected period
-                if period == "Monthly":
-                    results = get_mau_data()
-                    mrr_results = get_mrr_data()
-                    retention_results = get_monthly_retention_data()
-                    revenue_retention_results = get_monthly_revenue_retention_data()
-                    quick_ratio_results = get_monthly_quick_ratio_data()
-                    revenue_quick_ratio_results = get_monthly_revenue_quick_ratio_data()
-                    cohorts_results = get_monthly_cohorts_data()
-                    st.session_state.period_data = {
-                        'results': results,
-                        'revenue_results': mrr_results,
-                        'retention_results': retention_results,
-                        'revenue_retention_results': revenue_retention_results,
-                        'quick_ratio_results': quick_ratio_results,
-                        'revenue_quick_ratio_results': revenue_quick_ratio_results,
-                        'cohorts_results': cohorts_results,
-                        'period': "Monthly"
-                    }
-                elif period == "Weekly":
-                    results = get_wau_data()
-                    wrr_results = get_wrr_data()
-                    retention_results = get_weekly_retention_data()
-                    revenue_retention_results = get_weekly_revenue_retention_data()
-                    quick_ratio_results = get_weekly_quick_ratio_data()
-                    revenue_quick_ratio_results = get_weekly_revenue_quick_ratio_data()
-                    cohorts_results = get_weekly_cohorts_data()
-                    st.session_state.period_data = {
-                        'results': results,
-                        'revenue_results': wrr_results,
-                        'retention_results': retention_results,
-                        'revenue_retention_results': revenue_retention_results,
-                        'quick_ratio_results': quick_ratio_results,
-                        'revenue_quick_ratio_results': revenue_quick_ratio_results,
-                        'cohorts_results': cohorts_results,
-                        'period': "Weekly"
-                    }
-                else:  # Daily
-                    results = get_dau_data()
-                    retention_results = get_daily_retention_data()
-                    drr_results = get_drr_data()
-                    revenue_retention_results = get_daily_revenue_retention_data()
-                    quick_ratio_results = get_daily_quick_ratio_data()
-                    revenue_quick_ratio_results = get_daily_revenue_quick_ratio_data()
-                    cohorts_results = get_daily_cohorts_data()
-                    st.session_state.period_data = {
-                        'results': results,
-                        'revenue_results': drr_results,
-                        'retention_results': retention_results,
-                        'revenue_retention_results': revenue_retention_results,
-                        'quick_ratio_results': quick_ratio_results,
-                        'revenue_quick_ratio_results': revenue_quick_ratio_results,
-                        'cohorts_results': cohorts_results,
-                        'period': "Daily"
-                    }
-                
                 st.session_state.filters_applied = True
+                
+                # Get all of the selected period's views at once, or once they are refreshed
+                st.session_state.pending_period = period
                 st.rerun()
     
+    # Load the requested period, waiting on the view refresh until its views are ready
+    pending_period = st.session_state.get('pending_period')
+    if pending_period:
+        if is_period_refreshed(pending_period):
+            del st.session_state.pending_period
+            try:
+                st.session_state.period_data = get_period_data(pending_period)
+                
+                # Load the other periods once these charts are shown
+                st.session_state.prefetch_pending = True
+            except Exception as e:
+                st.error(f"Error loading {pending_period.lower()} data: {str(e)}")
+            
+            refresh_job = get_refresh_job()
+            refresh_error = refresh_job.errors.get(PERIOD_GRANULARITIES[pending_period]) if refresh_job else None
+            if refresh_error:
+                st.warning(f"Warning: {pending_period.lower()} view refresh failed, views may be out of date ({refresh_error})")
+        else:
+            show_refresh_status(pending_period)
+    
     # Display data from session state
     if st.session_state.period_data:
         data = st.session_state.period_data
@@ -361,8 +348,8 @@ with tab2:
         # Static title for all views
         st.markdown("### Growth Trends")
         
-        if data['results'].data:
-            df = pd.DataFrame(data['results'].data)
+        if not data['results'].data.empty:
+            df = data['results'].data
             if data['period'] == "Monthly":
                 col1, col2 = st.columns(2)
                 with col1:
@@ -370,8 +357,8 @@ with tab2:
                     plot_mau(df)
                 with col2:
                     st.markdown("##### Revenue")
-                    if data['revenue_results'].data:
-                        df_mrr = pd.DataFrame(data['revenue_results'].data)
+                    if not data['revenue_results'].data.empty:
+                        df_mrr = data['revenue_results'].data
                         plot_mrr(df_mrr)
             
                 # Add Retention over Period section (only for Monthly)
@@ -380,16 +367,16 @@ with tab2:
                 col1, col2 = st.columns(2)
                 with col1:
                     st.markdown("##### User")
-                    if data['retention_results'].data:
-                        df_retention = pd.DataFrame(data['retention_results'].data)
+                    if not data['retention_results'].data.empty:
+                        df_retention = data['retention_results'].data
                         plot_retention_rates(df_retention, "month")
                     else:
                         st.info("No user retention data available.")
                         
                 with col2:
                     st.markdown("##### Revenue", help="Shows only revenue retained (does not include contraction or expansion)")
-                    if data['revenue_retention_results'].data:
-                        df_revenue_retention = pd.DataFrame(data['revenue_retention_results'].data)
+                    if not data['revenue_retention_results'].data.empty:
+                        df_revenue_retention = data['revenue_retention_results'].data
                         plot_retention_rates(df_revenue_retention, "month")
                     else:
                         st.info("No revenue retention data available.")
@@ -411,8 +398,8 @@ with tab2:
                 with col1:
                     st.markdown("##### User")
                     if (data.get('quick_ratio_results') and 
-                        data['quick_ratio_results'].data):
-                        df_quick_ratio = pd.DataFrame(data['quick_ratio_results'].data)
+                        not data['quick_ratio_results'].data.empty):
+                        df_quick_ratio = data['quick_ratio_results'].data
                         plot_quick_ratio(df_quick_ratio, "month")
                     else:
                         st.info("No quick ratio data available.")
@@ -420,8 +407,8 @@ with tab2:
                 with col2:
                     st.markdown("##### Revenue")
                     if (data.get('revenue_quick_ratio_results') and 
-                        data['revenue_quick_ratio_results'].data):
-                        df_revenue_quick_ratio = pd.DataFrame(data['revenue_quick_ratio_results'].data)
+                        not data['revenue_quick_ratio_results'].data.empty):
+                        df_revenue_quick_ratio = data['revenue_quick_ratio_results'].data
                         plot_quick_ratio(df_revenue_quick_ratio, "month")
                     else:
                         st.info("No revenue quick ratio data available.")
@@ -439,25 +426,22 @@ with tab2:
                 
                 st.markdown("<br/>", unsafe_allow_html=True)  # Extra whitespace
 
+                # Cohort matrix built once per fetch, shared by both heatmaps
+                cohorts = data.get('cohorts')
+
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.markdown("##### User Retention")
-                    if (data.get('cohorts_results') and 
-                        hasattr(data['cohorts_results'], 'data') and 
-                        data['cohorts_results'].data):
-                        df_cohorts = pd.DataFrame(data['cohorts_results'].data)
-                        plot_cohorts(df_cohorts, "month")
+                    if cohorts is not None:
+                        plot_cohorts(cohorts, "month")
                     else:
                         st.info("No cohorts data available.")
 
                 with col2:
                     st.markdown("##### User LTV")
-                    if (data.get('cohorts_results') and 
-                        hasattr(data['cohorts_results'], 'data') and 
-                        data['cohorts_results'].data):
-                        df_cohorts = pd.DataFrame(data['cohorts_results'].data)
-                        plot_ltv_cohorts(df_cohorts, "month")
+                    if cohorts is not None:
+                        plot_ltv_cohorts(cohorts, "month")
                     else:
                         st.info("No cohorts data available.")
             
@@ -468,8 +452,8 @@ with tab2:
                     plot_wau(df)
                 with col2:
                     st.markdown("##### Revenue")
-                    if data['revenue_results'].data:
-                        df_wrr = pd.DataFrame(data['revenue_results'].data)
+                    if not data['revenue_results'].data.empty:
+                        df_wrr = data['revenue_results'].data
                         plot_wrr(df_wrr)
             
                 # Update Retention over Period section for Weekly
@@ -478,16 +462,16 @@ with tab2:
                 col1, col2 = st.columns(2)
                 with col1:
                     st.markdown("##### User")
-                    if data['retention_results'].data:
-                        df_retention = pd.DataFrame(data['retention_results'].data)
+                    if not data['retention_results'].data.empty:
+                        df_retention = data['retention_results'].data
                         plot_retention_rates(df_retention, "week")
                     else:
                         st.info("No user retention data available.")
                         
                 with col2:
                     st.markdown("##### Revenue", help="Shows only revenue retained (does not include contraction or expansion)")
-                    if data['revenue_retention_results'].data:
-                        df_revenue_retention = pd.DataFrame(data['revenue_retention_results'].data)
+                    if not data['revenue_retention_results'].data.empty:
+                        df_revenue_retention = data['revenue_retention_results'].data
                         plot_retention_rates(df_revenue_retention, "week")
                     else:
                         st.info("No revenue retention data available.")
@@ -509,8 +493,8 @@ with tab2:
                 with col1:
                     st.markdown("##### User")
                     if (data.get('quick_ratio_results') and 
-                        data['quick_ratio_results'].data):
-                        df_quick_ratio = pd.DataFrame(data['quick_ratio_results'].data)
+                        not data['quick_ratio_results'].data.empty):
+                        df_quick_ratio = data['quick_ratio_results'].data
                         plot_quick_ratio(df_quick_ratio, "week")
                     else:
                         st.info("No quick ratio data available.")
@@ -518,8 +502,8 @@ with tab2:
                 with col2:
                     st.markdown("##### Revenue")
                     if (data.get('revenue_quick_ratio_results') and 
-                        data['revenue_quick_ratio_results'].data):
-                        df_revenue_quick_ratio = pd.DataFrame(data['revenue_quick_ratio_results'].data)
+                        not data['revenue_quick_ratio_results'].data.empty):
+                        df_revenue_quick_ratio = data['revenue_quick_ratio_results'].data
                         plot_quick_ratio(df_revenue_quick_ratio, "week")
                     else:
                         st.info("No revenue quick ratio data available.")
@@ -537,25 +521,22 @@ with tab2:
                 
                 st.markdown("<br/>", unsafe_allow_html=True)  # Extra whitespace
 
+                # Cohort matrix built once per fetch, shared by both heatmaps
+                cohorts = data.get('cohorts')
+
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.markdown("##### User Retention")
-                    if (data.get('cohorts_results') and 
-                        hasattr(data['cohorts_results'], 'data') and 
-                        data['cohorts_results'].data):
-                        df_cohorts = pd.DataFrame(data['cohorts_results'].data)
-                        plot_cohorts(df_cohorts, "week")
+                    if cohorts is not None:
+                        plot_cohorts(cohorts, "week")
                     else:
                         st.info("No cohorts data available.")
 
                 with col2:
                     st.markdown("##### User LTV")
-                    if (data.get('cohorts_results') and 
-                        hasattr(data['cohorts_results'], 'data') and 
-                        data['cohorts_results'].data):
-                        df_cohorts = pd.DataFrame(data['cohorts_results'].data)
-                        plot_ltv_cohorts(df_cohorts, "week")
+                    if cohorts is not None:
+                        plot_ltv_cohorts(cohorts, "week")
                     else:
                         st.info("No cohorts data available.")
             else:
@@ -565,8 +546,8 @@ with tab2:
                     plot_dau(df)
                 with col2:
                     st.markdown("##### Revenue")
-                    if data['revenue_results'].data:
-                        df_drr = pd.DataFrame(data['revenue_results'].data)
+                    if not data['revenue_results'].data.empty:
+                        df_drr = data['revenue_results'].data
                         plot_drr(df_drr)
                         
                 # Update Retention over Period section for Daily
@@ -575,16 +556,16 @@ with tab2:
                 col1, col2 = st.columns(2)
                 with col1:
                     st.markdown("##### User")
-                    if data['retention_results'].data:
-                        df_retention = pd.DataFrame(data['retention_results'].data)
+                    if not data['retention_results'].data.empty:
+                        df_retention = data['retention_results'].data
                         plot_retention_rates(df_retention, "day")
                     else:
                         st.info("No user retention data available.")
                         
                 with col2:
                     st.markdown("##### Revenue", help="Shows only revenue retained (does not include contraction or expansion)")
-                    if data['revenue_retention_results'].data:
-                        df_revenue_retention = pd.DataFrame(data['revenue_retention_results'].data)
+                    if not data['revenue_retention_results'].data.empty:
+                        df_revenue_retention = data['revenue_retention_results'].data
                         plot_retention_rates(df_revenue_retention, "day")
                     else:
                         st.info("No revenue retention data available.")
@@ -606,8 +587,8 @@ with tab2:
                 with col1:
                     st.markdown("##### User")
                     if (data.get('quick_ratio_results') and 
-                        data['quick_ratio_results'].data):
-                        df_quick_ratio = pd.DataFrame(data['quick_ratio_results'].data)
+                        not data['quick_ratio_results'].data.empty):
+                        df_quick_ratio = data['quick_ratio_results'].data
                         plot_quick_ratio(df_quick_ratio, "day")
                     else:
                         st.info("No quick ratio data available.")
@@ -615,8 +596,8 @@ with tab2:
                 with col2:
                     st.markdown("##### Revenue")
                     if (data.get('revenue_quick_ratio_results') and 
-                        data['revenue_quick_ratio_results'].data):
-                        df_revenue_quick_ratio = pd.DataFrame(data['revenue_quick_ratio_results'].data)
+                        not data['revenue_quick_ratio_results'].data.empty):
+                        df_revenue_quick_ratio = data['revenue_quick_ratio_results'].data
                         plot_quick_ratio(df_revenue_quick_ratio, "day")
                     else:
                         st.info("No revenue quick ratio data available.")
@@ -634,31 +615,32 @@ with tab2:
                 
                 st.markdown("<br/>", unsafe_allow_html=True)  # Extra whitespace
 
+                # Cohort matrix built once per fetch, shared by both heatmaps
+                cohorts = data.get('cohorts')
+
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.markdown("##### User Retention")
-                    if (data.get('cohorts_results') and 
-                        hasattr(data['cohorts_results'], 'data') and 
-                        data['cohorts_results'].data):
-                        df_cohorts = pd.DataFrame(data['cohorts_results'].data)
-                        plot_cohorts(df_cohorts, "day")
+                    if cohorts is not None:
+                        plot_cohorts(cohorts, "day")
                     else:
                         st.info("No cohorts data available.")
 
                 with col2:
                     st.markdown("##### User LTV")
-                    if (data.get('cohorts_results') and 
-                        hasattr(data['cohorts_results'], 'data') and 
-                        data['cohorts_results'].data):
-                        df_cohorts = pd.DataFrame(data['cohorts_results'].data)
-                        plot_ltv_cohorts(df_cohorts, "day")
+                    if cohorts is not None:
+                        plot_ltv_cohorts(cohorts, "day")
                     else:
                         st.info("No cohorts data available.")
         else:
             st.info(f"No {data['period'].lower()} data available. Please upload data in the Upload tab.")
-    else:
+    elif not st.session_state.get('pending_period'):
         st.info("Select filters and click 'Apply filters' to view the data")
+    
+    # The period's charts are rendered, so warm the other periods in the background
+    if st.session_state.pop('prefetch_pending', False):
+        start_prefetch([p for p in PERIOD_GRANULARITIES if p != st.session_state.period_data['period']])
 
     try:
         # Only log metrics if the data is actually loaded
@@ -0,0 +1,217 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from storage import VIEWS, naive_datetimes
+
+
+class ResultCache:
+    """Bounded LRU cache of view reads with a TTL.
+
+    Keys start with the session id, so all of a session's entries can be dropped when
+    its data changes. Safe to use from the parallel fetch threads.
+
+    Invalidating also bumps the session's generation. Readers take the generation
+    before reading and pass it to put, so a read that was in flight across an
+    invalidation (e.g. a background prefetch) cannot store data from before it.
+    """
+
+    def __init__(self, max_entries=256, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def generation(self, session_id):
+        """Current generation of a session's entries, to pass to put after reading"""
+        with self.lock:
+            return self.generations.get(session_id, 0)
+
+    def get(self, key):
+        """Cached value for key, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if monotonic() - stored_at > self.ttl:
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, generation=None):
+        """Store value unless the session was invalidated since generation was taken"""
+        with self.lock:
+            if generation is not None and generation != self.generations.get(key[0], 0):
+                return
+            self.entries[key] = (monotonic(), value)
+            self.entries.move_to_end(key)
+
+            # Evict least recently used entries beyond the bound
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, session_id):
+        """Drop every entry belonging to a session and start its next generation"""
+        with self.lock:
+            self.generations[session_id] = self.generations.get(session_id, 0) + 1
+            for key in [key for key in self.entries if key[0] == session_id]:
+                del self.entries[key]
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Process-wide view result cache shared by all sessions"""
+    return ResultCache()
+
+
+class UploadCache:
+    """Parsed uploads by (session id, content hash), bounded by their memory use.
+
+    Each session keeps only its latest upload; beyond max_bytes the least recently
+    used uploads are dropped. Frames are shared, so callers must not modify them.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, session_id, digest):
+        """Cached frame for the upload, or None"""
+        with self.lock:
+            entry = self.entries.get(session_id)
+            if entry is None or entry[0] != digest:
+                return None
+
+            self.entries.move_to_end(session_id)
+            return entry[2]
+
+    def put(self, session_id, digest, frame):
+        size = int(frame.memory_usage(deep=True).sum())
+        with self.lock:
+            self._drop(session_id)
+            self.entries[session_id] = (digest, size, frame)
+            self.total_bytes += size
+
+            # Evict least recently used uploads, but always keep the one just parsed
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self._drop(next(iter(self.entries)))
+
+    def invalidate(self, session_id):
+        """Drop a session's upload"""
+        with self.lock:
+            self._drop(session_id)
+
+    def _drop(self, session_id):
+        entry = self.entries.pop(session_id, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+
+@st.cache_resource
+def get_upload_cache() -> UploadCache:
+    """Process-wide parsed upload cache shared by all sessions"""
+    return UploadCache()
+
+
+class RangeEntry(NamedTuple):
+    """Frame of a view loaded for [start, end] (None is unbounded), with its date keys"""
+    start: object
+    end: object
+    keys: np.ndarray
+    frame: pd.DataFrame
+
+
+def _days(column):
+    # Date part of datetime64 values, comparable with filter dates
+    return naive_datetimes(column).to_numpy().astype('datetime64[D]')
+
+
+def _entry(date_column, start, end, frame):
+    frame = frame.reset_index(drop=True)
+    return RangeEntry(start, end, _days(frame[date_column]), frame)
+
+
+def _covers(entry, start, end):
+    starts_inside = entry.start is None or (start is not None and start >= entry.start)
+    ends_inside = entry.end is None or (end is not None and end <= entry.end)
+    return starts_inside and ends_inside
+
+
+def _disjoint(entry, start, end):
+    before = end is not None and entry.start is not None and end < entry.start
+    after = start is not None and entry.end is not None and start > entry.end
+    return before or after
+
+
+def _slice(entry, start, end):
+    """Rows within [start, end], bounded by binary search on the sorted date keys"""
+    lo = 0 if start is None else np.searchsorted(entry.keys, np.datetime64(start, 'D'), 'left')
+    hi = len(entry.keys) if end is None else np.searchsorted(entry.keys, np.datetime64(end, 'D'), 'right')
+    return entry.frame.iloc[lo:hi]
+
+
+def cached_range(cache, view, session_id, start_date=None, end_date=None):
+    """Rows for the range if the cache already covers it, otherwise None"""
+    entry = cache.get((session_id, view))
+    if entry is None or not _covers(entry, start_date, end_date):
+        return None
+    return _slice(entry, start_date, end_date)
+
+
+def store_range(cache, view, session_id, start_date, end_date, frame, generation):
+    """Cache a frame read elsewhere (e.g. a bundled snapshot) for exactly [start, end].
+
+    generation is the cache's generation for the session taken before the read.
+    """
+    entry = _entry(VIEWS[view].date_column, start_date, end_date, frame)
+    cache.put((session_id, view), entry, generation)
+
+
+def read_range(backend, cache, view, session_id, start_date=None, end_date=None, cancelled=None):
+    """Read a view through the cache, keeping the widest date range loaded per view.
+
+    A range inside what is cached is sliced locally. A range reaching past it only
+    fetches the missing edge(s) and merges them in; a disjoint range replaces the entry.
+    Relies on the view being ordered ascending by its date column. cancelled is passed
+    to the backend's reads (StorageBackend.read_view).
+    """
+    date_column = VIEWS[view].date_column
+    key = (session_id, view)
+    generation = cache.generation(session_id)
+    entry = cache.get(key)
+
+    if entry is None or _disjoint(entry, start_date, end_date):
+        frame = backend.read_view(view, session_id, start_date, end_date, cancelled)
+        entry = _entry(date_column, start_date, end_date, frame)
+
+    elif not _covers(entry, start_date, end_date):
+        frames = [entry.frame]
+        start, end = entry.start, entry.end
+
+        # Edge reads overlap the cached bound by one day, so drop rows already held
+        if entry.start is not None and (start_date is None or start_date < entry.start):
+            left = backend.read_view(view, session_id, start_date, entry.start, cancelled)
+            frames.insert(0, left[_days(left[date_column]) < np.datetime64(entry.start, 'D')])
+            start = start_date
+
+        if entry.end is not None and (end_date is None or end_date > entry.end):
+            right = backend.read_view(view, session_id, entry.end, end_date, cancelled)
+            frames.append(right[_days(right[date_column]) > np.datetime64(entry.end, 'D')])
+            end = end_date
+
+        # Empty edges add nothing, and pandas warns about concatenating them
+        frames = [frame for frame in frames if len(frame)] or [entry.frame]
+        entry = _entry(date_column, start, end, pd.concat(frames, ignore_index=True))
+
+    cache.put(key, entry, generation)
+    return _slice(entry, start_date, end_date)
@@ -1,1231 +1,571 @@
-from st_supabase_connection import SupabaseConnection, execute_query
 import streamlit as st
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from time import sleep
-from typing import List
-import math
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-def init_connection():
-    """Initialize Supabase connection"""
-    return st.connection("supabase", type=SupabaseConnection)
-
-def create_revenue_table_batch(df_chunk, session_id):
-    """Insert a single batch of data with retry logic"""
-    max_retries = 5  # Increased retries
-    retry_delay = 0.5  # Reduced initial delay
-    
-    for attempt in range(max_retries):
-        try:
-            conn = init_connection()
-            
-            # Prepare data
-            df_chunk = df_chunk.copy()
-            df_chunk = df_chunk.rename(columns={
-                'date': 'transaction_date',
-                'id': 'transaction_id'
-            })
-            df_chunk['session_id'] = session_id  # Use passed session_id
-            
-            # Insert data
-            records = df_chunk.to_dict('records')
-            result = execute_query(
-                conn.table("revenue_data").upsert(records),
-                ttl=0
-            )
-            
-            return result
-            
-        except Exception as e:
-            if attempt == max_retries - 1:  # Last attempt
-                raise e
-            sleep(retry_delay * (2 ** attempt))  # True exponential backoff
-            continue
-
-def create_revenue_table(df):
-    """Insert data into revenue_data table with parallel processing"""
-    # Get session_id once before parallel processing
-    session_id = st.session_state.session_id
-    
-    # Much smaller batch size for better parallelization
-    batch_size = 1000  # Smaller batches for better distribution
-    total_rows = len(df)
-    num_batches = math.ceil(total_rows / batch_size)
-    
-    # Create batches
-    batches = []
-    for i in range(0, total_rows, batch_size):
-        chunk = df[i:min(i + batch_size, total_rows)]
-        batches.append(chunk)
-    
-    # Process batches in parallel
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        # Submit all tasks with session_id
-        future_to_batch = {
-            executor.submit(create_revenue_table_batch, batch, session_id): i 
-            for i, batch in enumerate(batches)
+from storage import VIEWS, QueryResult, UploadJob, get_backend, typed_frame
+from cache import cached_range, get_result_cache, read_range, store_range
+from engine import (
+    cohort_matrix_from_rows,
+    cohort_range,
+    compute_cohorts,
+    compute_growth,
+    compute_quick_ratio,
+    compute_retention,
+    compute_revenue,
+    compute_revenue_quick_ratio,
+    compute_revenue_retention,
+    prepare_transactions,
+    user_activity
+)
+
+# Views behind each period_data entry for every period selector option
+PERIOD_VIEWS = {
+    "Monthly": {
+        'results': "mau_view",
+        'revenue_results': "mrr_view",
+        'retention_results': "monthly_retention_view",
+        'revenue_retention_results': "monthly_revenue_retention_view",
+        'quick_ratio_results': "monthly_quick_ratio_view",
+        'revenue_quick_ratio_results': "monthly_revenue_quick_ratio_view",
+        'cohorts_results': "monthly_cohorts_view"
+    },
+    "Weekly": {
+        'results': "wau_view",
+        'revenue_results': "wrr_view",
+        'retention_results': "weekly_retention_view",
+        'revenue_retention_results': "weekly_revenue_retention_view",
+        'quick_ratio_results': "weekly_quick_ratio_view",
+        'revenue_quick_ratio_results': "weekly_revenue_quick_ratio_view",
+        'cohorts_results': "weekly_cohorts_view"
+    },
+    "Daily": {
+        'results': "dau_view",
+        'revenue_results': "drr_view",
+        'retention_results': "daily_retention_view",
+        'revenue_retention_results': "daily_revenue_retention_view",
+        'quick_ratio_results': "daily_quick_ratio_view",
+        'revenue_quick_ratio_results': "daily_revenue_quick_ratio_view",
+        'cohorts_results': "daily_cohorts_view"
+    }
+}
+
+# Period column of each period selector option
+PERIOD_UNITS = {"Monthly": "month", "Weekly": "week", "Daily": "day"}
+
+# View refresh granularity of each period selector option
+PERIOD_GRANULARITIES = {"Monthly": "monthly", "Weekly": "weekly", "Daily": "daily"}
+
+# Cancel flags of running background prefetches, by session
+_prefetches = {}
+_prefetches_lock = threading.Lock()
+
+# Checkpoints of each session's unfinished upload, kept so a retry can resume it.
+# Only held in this process: resuming does not survive a restart of the app server.
+_uploads = {}
+
+# Latest view refresh job of each session
+_refreshes = {}
+
+# Local period data of sessions whose upload was parsed in memory, least recently used first
+_local_sources = OrderedDict()
+_local_sources_lock = threading.Lock()
+MAX_LOCAL_SOURCES = 32
+
+
+class LocalPeriodSource:
+    """Period data computed in process from a session's uploaded frame.
+
+    Stands in for every view of the session, so nothing waits for a view refresh or
+    is transferred. Each period's frames and cohort matrix are computed once on first
+    use, then date filters are applied the way the views' where clause does.
+    """
+
+    def __init__(self, df):
+        self.tx = prepare_transactions(df)
+        self.periods = {}
+        self.lock = threading.Lock()
+
+    def _compute(self, period):
+        unit = PERIOD_UNITS[period]
+        activity = user_activity(self.tx, unit)
+        growth = compute_growth(activity, unit)
+        revenue = compute_revenue(activity, unit)
+        frames = {
+            'results': growth,
+            'retention_results': compute_retention(growth, unit),
+            'quick_ratio_results': compute_quick_ratio(growth, unit),
+            'revenue_results': revenue,
+            'revenue_retention_results': compute_revenue_retention(revenue, unit),
+            'revenue_quick_ratio_results': compute_revenue_quick_ratio(revenue, unit)
         }
-        
-        # Process completed tasks
-        for future in as_completed(future_to_batch):
-            batch_idx = future_to_batch[future]
+        # Same columns and dtypes as the views they stand in for
+        frames = {key: typed_frame(PERIOD_VIEWS[period][key], frame) for key, frame in frames.items()}
+        return frames, compute_cohorts(activity, unit)
+
+    def read(self, period, start_date=None, end_date=None):
+        """A period's frames ({entry: frame}) and cohort matrix (None if empty) for a date range"""
+        with self.lock:
+            if period not in self.periods:
+                self.periods[period] = self._compute(period)
+            frames, cohorts = self.periods[period]
+
+        frames = {
+            key: _date_range(PERIOD_VIEWS[period][key], frame, start_date, end_date)
+            for key, frame in frames.items()
+        }
+        cohorts = cohort_range(cohorts, start_date, end_date)
+        return frames, cohorts if len(cohorts.cohorts) else None
+
+
+def _date_range(view, frame, start_date, end_date):
+    """Rows of a view's frame within [start_date, end_date] (None is unbounded)"""
+    dates = frame[VIEWS[view].date_column]
+    keep = pd.Series(True, index=frame.index)
+    if start_date:
+        keep &= dates >= pd.Timestamp(start_date)
+    if end_date:
+        keep &= dates <= pd.Timestamp(end_date)
+    return frame[keep].reset_index(drop=True)
+
+
+def _set_local_source(session_id, source):
+    with _local_sources_lock:
+        _local_sources.pop(session_id, None)
+        if source is None:
+            return
+        _local_sources[session_id] = source
+        while len(_local_sources) > MAX_LOCAL_SOURCES:
+            _local_sources.popitem(last=False)
+
+
+def _get_local_source(session_id):
+    with _local_sources_lock:
+        source = _local_sources.get(session_id)
+        if source is not None:
+            _local_sources.move_to_end(session_id)
+        return source
+
+
+class RefreshJob:
+    """A session's view refresh running in the background.
+
+    Each granularity goes from queued to refreshing to ready; failed ones are ready
+    too, with the error kept for the UI to warn about, as the views are still readable.
+    """
+
+    def __init__(self, granularities):
+        self.job_id = uuid.uuid4().hex
+        self.queued = list(granularities)
+        self.refreshing = []
+        self.ready = []
+        self.errors = {}
+        self.changed = threading.Condition()
+
+    def _move(self, granularity, source, target):
+        with self.changed:
+            source.remove(granularity)
+            target.append(granularity)
+            self.changed.notify_all()
+
+    @property
+    def status(self):
+        """'queued', 'refreshing <granularities>' or 'done'"""
+        with self.changed:
+            if self.refreshing:
+                return "refreshing " + ", ".join(self.refreshing)
+            return "queued" if self.queued else "done"
+
+    @property
+    def done(self):
+        return self.status == "done"
+
+    def _is_ready(self, granularity):
+        # Granularities the job does not refresh have nothing to wait for
+        return granularity not in self.queued and granularity not in self.refreshing
+
+    def is_ready(self, granularity):
+        with self.changed:
+            return self._is_ready(granularity)
+
+    def wait(self, granularity, timeout=None):
+        """Block until a granularity is ready, returning False on timeout"""
+        with self.changed:
+            return self.changed.wait_for(lambda: self._is_ready(granularity), timeout)
+
+    def run(self, backend, session_id):
+        """Refresh every queued granularity concurrently, updating the status as they go"""
+        def refresh(granularity):
+            self._move(granularity, self.queued, self.refreshing)
             try:
-                future.result()  # This will raise any exceptions that occurred
+                backend.refresh_granularity(session_id, granularity)
             except Exception as e:
-                # If a batch fails, raise the error with batch information
-                raise Exception(f"Error processing batch {batch_idx}: {str(e)}")
-    
-    return True
-
-def refresh_views(session_id):
-    """Refresh all views for the given session"""
-    conn = init_connection()
-    
-    try:
-        # First refresh the non-materialized views by querying them
-        views_to_refresh = [
-            "mau_view", "wau_view", "dau_view", 
-            "mrr_view", "wrr_view", "drr_view"
-        ]
-        
-        for view in views_to_refresh:
+                self.errors[granularity] = str(e)
+            self._move(granularity, self.refreshing, self.ready)
+
+        if self.queued:
+            with ThreadPoolExecutor(max_workers=len(self.queued)) as executor:
+                executor.map(refresh, list(self.queued))
+
+def has_resumable_upload(df):
+    """Whether the current session has an interrupted upload of this same data"""
+    job = _uploads.get(st.session_state.session_id)
+    return job is not None and job.matches(df)
+
+def has_resumable_stream(fingerprint):
+    """Whether the current session has an interrupted streamed upload of the same file"""
+    job = _uploads.get(st.session_state.session_id)
+    return job is not None and job.fingerprint == fingerprint
+
+def create_revenue_table(df, on_progress=None):
+    """Insert data into revenue_data table for the current session.
+
+    Resumes an interrupted upload of the same data from its checkpoints, otherwise
+    starts a new one. on_progress(rows) is called with the rows stored so far.
+    """
+    # Get session_id once before the backend fans out
+    session_id = st.session_state.session_id
+    cancel_prefetch(session_id)
+    get_result_cache().invalidate(session_id)
+
+    job = _uploads.get(session_id)
+    if job is None or not job.matches(df):
+        job = _uploads[session_id] = UploadJob.of_frame(df)
+
+    _set_local_source(session_id, None)
+    result = get_backend().ingest(df, session_id, on_progress, job)
+    del _uploads[session_id]
+
+    # The frame is at hand, so charts are computed from it rather than read back
+    _set_local_source(session_id, LocalPeriodSource(df))
+    return result
+
+def start_refresh():
+    """Refresh the current session's views in a background thread.
+
+    Granularities are refreshed concurrently; poll the returned job (also available
+    through get_refresh_job) to find out when each one can be read.
+    """
+    backend = get_backend()
+    session_id = st.session_state.session_id
+    get_result_cache().invalidate(session_id)
+
+    job = _refreshes[session_id] = RefreshJob(backend.refresh_granularities)
+    threading.Thread(target=job.run, args=(backend, session_id), name=f"refresh-{session_id}", daemon=True).start()
+    return job
+
+def get_refresh_job():
+    """The current session's latest view refresh job, or None"""
+    return _refreshes.get(st.session_state.session_id)
+
+def is_period_refreshed(period):
+    """Whether a period's data can be read: it is computed locally or no refresh of its views is pending"""
+    if _get_local_source(st.session_state.session_id) is not None:
+        return True
+    job = get_refresh_job()
+    return job is None or job.is_ready(PERIOD_GRANULARITIES[period])
+
+def _read_ahead(chunks):
+    """Iterate chunks while a background thread produces the next one.
+
+    At most one finished chunk waits, so memory stays bounded; the producer stops
+    when the consumer does.
+    """
+    ready = queue.Queue(maxsize=1)
+    stopped = threading.Event()
+    finished = object()
+
+    def offer(item):
+        # Give up waiting for room once the consumer has stopped
+        while not stopped.is_set():
             try:
-                execute_query(
-                    conn.table(view).select("count").eq('session_id', session_id),
-                    ttl=0
-                )
-                sleep(0.5)  # Small delay between views
-            except Exception as e:
-                st.warning(f"Warning: {view} refresh failed, but continuing... ({str(e)})")
+                ready.put(item, timeout=0.2)
+                return True
+            except queue.Full:
                 continue
-        
-        # Then trigger materialized view refreshes one at a time
-        materialized_views = ['daily', 'weekly', 'monthly']
-        for view in materialized_views:
-            try:
-                execute_query(
-                    conn.table("refresh_trigger")
-                    .insert({
-                        "created_at": "now()", 
-                        "view_name": view,
-                        "session_id": session_id
-                    }),
-                    ttl=0
-                )
-                sleep(2)  # Wait between refreshes
-            except Exception as e:
-                st.warning(f"Warning: {view} refresh failed, but continuing... ({str(e)})")
-        
-        return True
-        
-    except Exception as e:
-        raise Exception(f"View refresh failed: {str(e)}")
+        return False
 
-def get_daily_revenue():
-    """Get all revenue data for current session"""
-    conn = init_connection()
-    
-    # Build base query
-    query = (conn.table("revenue_data")
-            .select("*")
-            .eq('session_id', st.session_state.session_id))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('transaction_date', desc=True),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    def produce():
+        try:
+            for chunk in chunks:
+                if not offer(chunk):
+                    return
+            offer(finished)
+        except Exception as e:
+            offer(e)
+
+    threading.Thread(target=produce, name="read-ahead", daemon=True).start()
+    try:
+        while True:
+            item = ready.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+def stream_revenue_table(chunks, fingerprint, on_progress=None):
+    """Insert data arriving as parsed chunks into revenue_data for the current session.
+
+    All chunks go through one run of the backend's upload pipeline, the next chunk
+    being parsed while batches of the current one are stored, so only a couple of
+    chunks are held at once. fingerprint identifies the file (upload.stream_fingerprint):
+    retrying an interrupted upload of the same file resumes it from its checkpoints.
+    on_progress(rows) is called with the rows stored so far. Returns the row count.
+    """
+    session_id = st.session_state.session_id
+    cancel_prefetch(session_id)
+    get_result_cache().invalidate(session_id)
+    # Streamed files are never held whole, so their charts come from the views
+    _set_local_source(session_id, None)
+
+    job = _uploads.get(session_id)
+    if job is None or job.fingerprint != fingerprint:
+        job = _uploads[session_id] = UploadJob(fingerprint)
+
+    chunks = _read_ahead(chunks)
+    try:
+        total_rows = get_backend().ingest_chunks(chunks, session_id, job, on_progress)
+    finally:
+        # Stops the parsing thread if the upload ended early
+        chunks.close()
+    del _uploads[session_id]
+    return total_rows
 
 def clear_session_data():
     """Delete all data for current session"""
-    conn = init_connection()
     try:
-        # First verify the session exists
-        result = execute_query(
-            conn.table("revenue_data")
-            .select("count")  # Use PostgreSQL count
-            .eq('session_id', st.session_state.session_id),
-            ttl=0
-        )
-        
-        if result.data:
-            # Execute delete with explicit session check
-            result = execute_query(
-                conn.table("revenue_data")
-                .delete()
-                .eq('session_id', st.session_state.session_id),
-                ttl=0
-            )
-            return result
-        return None
+        cancel_prefetch(st.session_state.session_id)
+        get_result_cache().invalidate(st.session_state.session_id)
+        _uploads.pop(st.session_state.session_id, None)
+        _refreshes.pop(st.session_state.session_id, None)
+        _set_local_source(st.session_state.session_id, None)
+        return get_backend().clear(st.session_state.session_id)
     except Exception as e:
         st.error(f"Error clearing data: {str(e)}")
         raise
 
+def _read_args():
+    """Session id and date filters (once filters were applied) for view reads.
+
+    Resolved on the script thread, since worker threads cannot read session state.
+    """
+    start_date = None
+    end_date = None
+
+    # Get filter dates from session state
+    if st.session_state.get('filters_applied'):
+        start_date = st.session_state.get('period_start_date')
+        end_date = st.session_state.get('period_end_date')
+
+    return st.session_state.session_id, start_date, end_date
+
+def _read_view(view):
+    """Read a view for the current session with date filters"""
+    return QueryResult(read_range(get_backend(), get_result_cache(), view, *_read_args()))
+
+def _load_period(backend, cache, period, views, session_id, start_date, end_date, cancelled=None):
+    """Frames for each of a period's views ({entry: view}), from the cache where possible.
+
+    Views the cache cannot answer come from one bundled snapshot call when the backend
+    has one, otherwise from parallel per-view reads. Setting cancelled (a threading.Event)
+    stops the reads before their next round trip with ReadCancelled.
+    """
+    rows = {key: cached_range(cache, view, session_id, start_date, end_date) for key, view in views.items()}
+    missing = [key for key in views if rows[key] is None]
+
+    # A single round trip beats several once more than one view is needed, and it
+    # carries only the views the cache could not answer
+    if len(missing) > 1:
+        generation = cache.generation(session_id)
+        wanted = {key: views[key] for key in missing}
+        snapshot = backend.read_snapshot(period, wanted, session_id, start_date, end_date, cancelled)
+        if snapshot is not None:
+            for key in missing:
+                rows[key] = snapshot[key]
+                store_range(cache, views[key], session_id, start_date, end_date, rows[key], generation)
+            missing = []
+
+    # Latency is the slowest view rather than the sum of all of them
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            futures = {
+                key: executor.submit(
+                    read_range, backend, cache, views[key], session_id, start_date, end_date, cancelled
+                )
+                for key in missing
+            }
+            for key, future in futures.items():
+                rows[key] = future.result()
+
+    return rows
+
+def get_period_data(period):
+    """Read all views for a period and assemble the period_data dict.
+
+    Sessions whose upload is held in memory get it computed by their LocalPeriodSource
+    instead, without the cohort rows the matrix is otherwise built from. Frames and the
+    cohort matrix are built here once per fetch; reruns reuse them.
+    """
+    session_id, start_date, end_date = _read_args()
+
+    # Interactive reads take priority over any background prefetch
+    cancel_prefetch(session_id)
+
+    source = _get_local_source(session_id)
+    if source is not None:
+        rows, cohorts = source.read(period, start_date, end_date)
+    else:
+        views = PERIOD_VIEWS[period]
+        rows = _load_period(get_backend(), get_result_cache(), period, views, session_id, start_date, end_date)
+        cohort_rows = rows['cohorts_results']
+        cohorts = None if cohort_rows.empty else cohort_matrix_from_rows(cohort_rows, PERIOD_UNITS[period])
+
+    period_data = {key: QueryResult(frame) for key, frame in rows.items()}
+    period_data['period'] = period
+    period_data['cohorts'] = cohorts
+    return period_data
+
+def cancel_prefetch(session_id):
+    """Stop a session's background prefetch before its next view read"""
+    with _prefetches_lock:
+        cancelled = _prefetches.pop(session_id, None)
+    if cancelled is not None:
+        cancelled.set()
+
+def start_prefetch(periods):
+    """Load other periods' views into the result cache in a background thread.
+
+    Uses the current date filters, so switching period afterwards is a cache hit.
+    Periods still being refreshed are read once their refresh finishes.
+    Best effort: failures are ignored and the interactive read will retry them.
+    Sessions computed locally have nothing to prefetch.
+    """
+    backend = get_backend()
+    cache = get_result_cache()
+    session_id, start_date, end_date = _read_args()
+    refresh = get_refresh_job()
+
+    cancel_prefetch(session_id)
+    if _get_local_source(session_id) is not None:
+        return
+    cancelled = threading.Event()
+    with _prefetches_lock:
+        _prefetches[session_id] = cancelled
+
+    def prefetch():
+        for period in periods:
+            if refresh is not None:
+                while not refresh.wait(PERIOD_GRANULARITIES[period], timeout=0.2):
+                    if cancelled.is_set():
+                        return
+            if cancelled.is_set():
+                return
+            try:
+                _load_period(
+                    backend, cache, period, PERIOD_VIEWS[period], session_id, start_date, end_date, cancelled
+                )
+            except Exception:
+                return
+
+        with _prefetches_lock:
+            if _prefetches.get(session_id) is cancelled:
+                del _prefetches[session_id]
+
+    threading.Thread(target=prefetch, name=f"prefetch-{session_id}", daemon=True).start()
+
+def get_daily_revenue():
+    """Get all revenue data for current session"""
+    return QueryResult(get_backend().read_view("revenue_data", st.session_state.session_id))
+
 def get_mau_data():
     """Get MAU data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("mau_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("mau_view")
 
 def get_wau_data():
     """Get WAU data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("wau_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('week', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('week'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("wau_view")
 
 def get_dau_data():
     """Get DAU data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("dau_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('day', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('day', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("dau_view")
 
 def get_mrr_data():
     """Get MRR data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("mrr_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("mrr_view")
 
 def get_wrr_data():
     """Get WRR data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("wrr_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('week', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('week'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("wrr_view")
+
+def get_drr_data():
+    """Get DRR data for current session with date filters"""
+    return _read_view("drr_view")
 
 def get_monthly_retention_data():
     """Get monthly retention data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("monthly_retention_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("monthly_retention_view")
 
 def get_weekly_retention_data():
     """Get weekly retention data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("weekly_retention_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('week', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('week'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("weekly_retention_view")
 
 def get_daily_retention_data():
     """Get daily retention data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("daily_retention_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('day', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('day', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
-
-def get_drr_data():
-    """Get DRR data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("drr_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('day', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('day', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("daily_retention_view")
 
 def get_monthly_revenue_retention_data():
     """Get monthly revenue retention data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("monthly_revenue_retention_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("monthly_revenue_retention_view")
 
 def get_weekly_revenue_retention_data():
     """Get weekly revenue retention data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("weekly_revenue_retention_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('week', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('week'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("weekly_revenue_retention_view")
 
 def get_daily_revenue_retention_data():
     """Get daily revenue retention data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("daily_revenue_retention_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('day', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('day', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("daily_revenue_retention_view")
 
 def get_monthly_quick_ratio_data():
     """Get monthly quick ratio data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("monthly_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("monthly_quick_ratio_view")
 
 def get_monthly_revenue_quick_ratio_data():
     """Get monthly revenue quick ratio data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("monthly_revenue_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("monthly_revenue_quick_ratio_view")
 
 def get_weekly_revenue_quick_ratio_data():
     """Get weekly revenue quick ratio data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("weekly_revenue_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('week', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('week'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("weekly_revenue_quick_ratio_view")
 
 def get_weekly_quick_ratio_data():
     """Get weekly quick ratio data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("weekly_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('week', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('week'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("weekly_quick_ratio_view")
 
 def get_daily_quick_ratio_data():
     """Get daily quick ratio data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("daily_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('day', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('day', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("daily_quick_ratio_view")
 
 def get_daily_revenue_quick_ratio_data():
     """Get daily revenue quick ratio data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("daily_revenue_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('day', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('day', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("daily_revenue_quick_ratio_view")
 
 def get_monthly_cohorts_data():
     """Get monthly cohorts data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("monthly_cohorts_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('first_month', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('first_month', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('first_month')
-            .order('active_month'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
-
-def get_initial_monthly_data():
-    """Get all monthly data for initial load"""
-    conn = init_connection()
-    
-    def paginated_query(query):
-        all_data = []
-        page_size = 1000
-        current_range = 0
-        
-        while True:
-            result = execute_query(
-                query.range(current_range, current_range + page_size - 1),
-                ttl=0
-            )
-            
-            if not result.data:
-                break
-                
-            all_data.extend(result.data)
-            
-            if len(result.data) < page_size:
-                break
-                
-            current_range += page_size
-        
-        result.data = all_data
-        return result
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    # Build base queries with session_id filter
-    base_queries = {
-        'mau': conn.table("mau_view").select("*").eq('session_id', st.session_state.session_id),
-        'mrr': conn.table("mrr_view").select("*").eq('session_id', st.session_state.session_id),
-        'retention': conn.table("monthly_retention_view").select("*").eq('session_id', st.session_state.session_id),
-        'revenue_retention': conn.table("monthly_revenue_retention_view").select("*").eq('session_id', st.session_state.session_id),
-        'quick_ratio': conn.table("monthly_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id),
-        'revenue_quick_ratio': conn.table("monthly_revenue_quick_ratio_view").select("*").eq('session_id', st.session_state.session_id),
-        'cohorts': conn.table("monthly_cohorts_view").select("*").eq('session_id', st.session_state.session_id)
-    }
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        for key in base_queries:
-            if key == 'cohorts':
-                base_queries[key] = base_queries[key].gte('first_month', start_date.strftime('%Y-%m-%d'))
-            else:
-                base_queries[key] = base_queries[key].gte('month', start_date.strftime('%Y-%m-%d'))
-    
-    if end_date and st.session_state.get('filters_applied'):
-        for key in base_queries:
-            if key == 'cohorts':
-                base_queries[key] = base_queries[key].lte('first_month', end_date.strftime('%Y-%m-%d'))
-            else:
-                base_queries[key] = base_queries[key].lte('month', end_date.strftime('%Y-%m-%d'))
-    
-    # Add ordering
-    for key in base_queries:
-        if key == 'cohorts':
-            base_queries[key] = base_queries[key].order('first_month').order('active_month')
-        else:
-            base_queries[key] = base_queries[key].order('month')
-    
-    # Execute queries and structure results
-    results = {
-        'results': paginated_query(base_queries['mau']),
-        'revenue_results': paginated_query(base_queries['mrr']),
-        'retention_results': paginated_query(base_queries['retention']),
-        'revenue_retention_results': paginated_query(base_queries['revenue_retention']),
-        'quick_ratio_results': paginated_query(base_queries['quick_ratio']),
-        'revenue_quick_ratio_results': paginated_query(base_queries['revenue_quick_ratio']),
-        'cohorts_results': paginated_query(base_queries['cohorts']),
-        'period': "Monthly"
-    }
-    
-    return results
+    return _read_view("monthly_cohorts_view")
 
 def get_weekly_cohorts_data():
     """Get weekly cohorts data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("weekly_cohorts_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('first_week', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('first_week', end_date.strftime('%Y-%m-%d'))
-    
-    return execute_query(
-        query.order('first_week').order('active_week'),
-        ttl=0
-    )
+    return _read_view("weekly_cohorts_view")
 
 def get_daily_cohorts_data():
     """Get daily cohorts data for current session with date filters"""
-    conn = init_connection()
-    
-    # Get filter dates from session state
-    start_date = st.session_state.get('period_start_date')
-    end_date = st.session_state.get('period_end_date')
-    
-    query = conn.table("daily_cohorts_view").select("*").eq('session_id', st.session_state.session_id)
-    
-    # Apply date filters if they exist and filters were applied
-    if start_date and st.session_state.get('filters_applied'):
-        query = query.gte('first_dt', start_date.strftime('%Y-%m-%d'))
-    if end_date and st.session_state.get('filters_applied'):
-        query = query.lte('first_dt', end_date.strftime('%Y-%m-%d'))
-    
-    # Initialize variables for pagination
-    all_data = []
-    page_size = 1000
-    current_range = 0
-    
-    while True:
-        # Get next page of results using range
-        result = execute_query(
-            query.range(current_range, current_range + page_size - 1)
-            .order('first_dt')
-            .order('active_day'),
-            ttl=0
-        )
-        
-        # If no more data, break
-        if not result.data:
-            break
-            
-        # Add this page's data
-        all_data.extend(result.data)
-        
-        # If we got less than a full page, we're done
-        if len(result.data) < page_size:
-            break
-            
-        # Move to next page
-        current_range += page_size
-    
-    # Return results in same format as before
-    result.data = all_data
-    return result
+    return _read_view("daily_cohorts_view")
 
+def get_initial_monthly_data():
+    """Get all monthly data for initial load"""
+    return get_period_data("Monthly")
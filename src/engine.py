@@ -0,0 +1,360 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+# Column names used by the views and the visuals for each period
+PERIOD_COLUMNS = {
+    "month": {"period": "month", "total": "mau"},
+    "week": {"period": "week", "total": "wau"},
+    "day": {"period": "day", "total": "dau"},
+}
+
+# 1970-01-01 was a Thursday, so Sunday-start weeks begin 3 days after the epoch
+_WEEK_OFFSET = 3
+
+
+class Transactions(NamedTuple):
+    """Transactions encoded once for the engine: day ordinals, user codes and revenue"""
+    days: np.ndarray
+    users: np.ndarray
+    revenue: np.ndarray
+
+
+class PeriodActivity(NamedTuple):
+    """Distinct (user, period) pairs sorted by user then period, with summed revenue"""
+    users: np.ndarray
+    periods: np.ndarray
+    revenue: np.ndarray
+    first_period: int
+    num_periods: int
+
+
+def prepare_transactions(df):
+    """Encode the uploaded DataFrame (date, id, revenue, user_id) as NumPy arrays"""
+    if isinstance(df, Transactions):
+        return df
+
+    if pd.api.types.is_integer_dtype(df['date']):
+        # Parsed uploads already carry day ordinals
+        days = df['date'].to_numpy().astype(np.int64)
+    else:
+        days = pd.to_datetime(df['date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    users = pd.factorize(df['user_id'])[0]
+    revenue = pd.to_numeric(df['revenue'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    # Rows without a user (code -1) belong to no cohort, as revenue_data requires one
+    known = users >= 0
+    if not known.all():
+        days, users, revenue = days[known], users[known], revenue[known]
+    return Transactions(days, users, revenue)
+
+
+def period_index(days, period):
+    """Map day ordinals to month, Sunday-start week or day ordinals"""
+    if period == "month":
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if period == "week":
+        return (days - _WEEK_OFFSET) // 7
+    return days
+
+
+def period_start(index, period):
+    """Inverse of period_index: first day of each period as datetime64"""
+    index = np.asarray(index, dtype=np.int64)
+    if period == "month":
+        return index.astype('datetime64[M]').astype('datetime64[ns]')
+    if period == "week":
+        return (index * 7 + _WEEK_OFFSET).astype('datetime64[D]').astype('datetime64[ns]')
+    return index.astype('datetime64[D]').astype('datetime64[ns]')
+
+
+def user_activity(df, period):
+    """Collapse transactions into distinct (user, period) pairs in one sort"""
+    tx = prepare_transactions(df)
+    periods = period_index(tx.days, period)
+
+    if len(periods) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return PeriodActivity(empty, empty, np.empty(0), 0, 0)
+
+    first_period = int(periods.min())
+    num_periods = int(periods.max()) - first_period + 1
+
+    # One int64 key per (user, period) so a single unique() both dedupes and sorts
+    keys = tx.users.astype(np.int64) * num_periods + (periods - first_period)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    revenue = np.bincount(inverse.ravel(), weights=tx.revenue, minlength=len(unique_keys))
+
+    return PeriodActivity(
+        users=unique_keys // num_periods,
+        periods=unique_keys % num_periods,
+        revenue=revenue,
+        first_period=first_period,
+        num_periods=num_periods
+    )
+
+
+def _neighbours(activity):
+    """Flags for whether each pair's user was active in the previous / next period"""
+    users, periods = activity.users, activity.periods
+    same_user = users[1:] == users[:-1]
+    consecutive = same_user & (periods[1:] - periods[:-1] == 1)
+
+    has_earlier = np.r_[False, same_user]
+    active_before = np.r_[False, consecutive]
+    active_after = np.r_[consecutive, False]
+    return has_earlier, active_before, active_after
+
+
+def compute_growth(df, period="month"):
+    """New/retained/resurrected/churned user counts per period.
+
+    Returns the same columns as mau_view/wau_view/dau_view, with churned as a
+    negative count and every period between the first and last activity present.
+    """
+    columns = PERIOD_COLUMNS[period]
+    activity = df if isinstance(df, PeriodActivity) else user_activity(df, period)
+    n = activity.num_periods
+    periods = activity.periods
+
+    has_earlier, active_before, active_after = _neighbours(activity)
+
+    new = np.bincount(periods[~has_earlier], minlength=n)
+    retained = np.bincount(periods[active_before], minlength=n)
+    resurrected = np.bincount(periods[has_earlier & ~active_before], minlength=n)
+
+    # A user churns in the period after their activity unless they were active again;
+    # churn past the last observed period is not counted
+    churn_periods = periods[~active_after] + 1
+    churned = np.bincount(churn_periods[churn_periods < n], minlength=n)
+
+    return pd.DataFrame({
+        columns["period"]: period_start(np.arange(n) + activity.first_period, period),
+        columns["total"]: new + retained + resurrected,
+        "new": new,
+        "retained": retained,
+        "resurrected": resurrected,
+        "churned": -churned
+    })
+
+
+def compute_retention(growth, period="month"):
+    """Period-over-period user retention (%) from a compute_growth frame"""
+    columns = PERIOD_COLUMNS[period]
+    previous = growth[columns["total"]].shift(1)
+    rate = growth["retained"] / previous * 100
+
+    df = pd.DataFrame({columns["period"]: growth[columns["period"]], "retention_rate": rate})
+    return df[previous > 0].reset_index(drop=True)
+
+
+def compute_quick_ratio(growth, period="month"):
+    """User quick ratio, (new + resurrected) / churned, from a compute_growth frame"""
+    columns = PERIOD_COLUMNS[period]
+    churned = -growth["churned"]
+    ratio = (growth["new"] + growth["resurrected"]) / churned
+
+    df = pd.DataFrame({columns["period"]: growth[columns["period"]], "quick_ratio": ratio})
+    return df[churned > 0].reset_index(drop=True)
+
+
+def compute_revenue(df, period="month"):
+    """Revenue accounting components per period.
+
+    Returns the same columns as mrr_view/wrr_view/drr_view: rev, retained, new,
+    expansion, resurrected, contraction and churned, with the last two negative.
+    """
+    columns = PERIOD_COLUMNS[period]
+    activity = df if isinstance(df, PeriodActivity) else user_activity(df, period)
+    n = activity.num_periods
+    periods, revenue = activity.periods, activity.revenue
+
+    has_earlier, active_before, active_after = _neighbours(activity)
+    previous = np.r_[0.0, revenue[:-1]]
+
+    def per_period(mask, values):
+        return np.bincount(periods[mask], weights=values[mask], minlength=n)
+
+    # Users active in consecutive periods split into retained, expansion and contraction
+    retained = per_period(active_before, np.minimum(revenue, previous))
+    expansion = per_period(active_before, np.maximum(revenue - previous, 0))
+    contraction = per_period(active_before, np.maximum(previous - revenue, 0))
+    new = per_period(~has_earlier, revenue)
+    resurrected = per_period(has_earlier & ~active_before, revenue)
+
+    churn_periods = periods[~active_after] + 1
+    in_range = churn_periods < n
+    churned = np.bincount(
+        churn_periods[in_range],
+        weights=revenue[~active_after][in_range],
+        minlength=n
+    )
+
+    return pd.DataFrame({
+        columns["period"]: period_start(np.arange(n) + activity.first_period, period),
+        "rev": np.bincount(periods, weights=revenue, minlength=n),
+        "retained": retained,
+        "new": new,
+        "expansion": expansion,
+        "resurrected": resurrected,
+        "contraction": 0.0 - contraction,
+        "churned": 0.0 - churned
+    })
+
+
+def compute_revenue_retention(revenue, period="month"):
+    """Share of last period's revenue retained (%), excluding expansion and contraction"""
+    columns = PERIOD_COLUMNS[period]
+    previous = revenue["rev"].shift(1)
+    rate = revenue["retained"] / previous * 100
+
+    df = pd.DataFrame({columns["period"]: revenue[columns["period"]], "retention_rate": rate})
+    return df[previous > 0].reset_index(drop=True)
+
+
+def compute_revenue_quick_ratio(revenue, period="month"):
+    """Revenue quick ratio, (new + resurrected + expansion) / (churned + contraction)"""
+    columns = PERIOD_COLUMNS[period]
+    lost = -(revenue["churned"] + revenue["contraction"])
+    ratio = (revenue["new"] + revenue["resurrected"] + revenue["expansion"]) / lost
+
+    df = pd.DataFrame({columns["period"]: revenue[columns["period"]], "quick_ratio": ratio})
+    return df[lost > 0].reset_index(drop=True)
+
+
+def compute_accounting(df):
+    """Growth and revenue accounting for every period from a single encoding pass"""
+    tx = prepare_transactions(df)
+    results = {}
+    for period in PERIOD_COLUMNS:
+        activity = user_activity(tx, period)
+        results[period] = {
+            "growth": compute_growth(activity, period),
+            "revenue": compute_revenue(activity, period)
+        }
+    return results
+
+
+# Cohort view columns and the number of periods since first purchase shown per period
+COHORT_COLUMNS = {
+    "month": {"first": "first_month", "since": "months_since_first", "max_periods": 24},
+    "week": {"first": "first_week", "since": "weeks_since_first", "max_periods": 52},
+    "day": {"first": "first_dt", "since": "days_since_first", "max_periods": 90},
+}
+
+
+class CohortMatrix(NamedTuple):
+    """Dense cohort triangles: one row per cohort, one column per period since first.
+
+    Cells past the last observed period are NaN so the heatmaps leave them blank.
+    """
+    cohorts: pd.DatetimeIndex
+    cohort_size: np.ndarray
+    users: np.ndarray
+    cum_amt: np.ndarray
+
+    @property
+    def retention(self):
+        return self.users / self.cohort_size[:, None]
+
+    @property
+    def ltv(self):
+        return self.cum_amt / self.cohort_size[:, None]
+
+    @property
+    def sizes(self):
+        """Cohort size repeated across the observed cells of each row"""
+        return np.where(np.isnan(self.users), np.nan, self.cohort_size[:, None])
+
+    def frame(self, values):
+        """Label a matrix with cohort dates and periods since first, for display"""
+        return pd.DataFrame(values, index=self.cohorts, columns=np.arange(values.shape[1]))
+
+
+def compute_cohorts(df, period="month"):
+    """Retention and cumulative revenue triangles built directly from transactions"""
+    max_periods = COHORT_COLUMNS[period]["max_periods"]
+    activity = df if isinstance(df, PeriodActivity) else user_activity(df, period)
+    users, periods, revenue = activity.users, activity.periods, activity.revenue
+
+    if len(periods) == 0:
+        empty = np.empty((0, 0))
+        return CohortMatrix(pd.DatetimeIndex([]), np.empty(0), empty, empty)
+
+    # Pairs are sorted by user then period, so a user's first pair is their cohort
+    has_earlier = np.r_[False, users[1:] == users[:-1]]
+    first_period = np.zeros(users.max() + 1, dtype=np.int64)
+    first_period[users[~has_earlier]] = periods[~has_earlier]
+    first = first_period[users]
+    since = periods - first
+
+    keep = since <= max_periods
+    cohort_periods, rows = np.unique(first[keep], return_inverse=True)
+    rows = rows.ravel()
+    cols = since[keep]
+    width = min(max_periods, activity.num_periods - 1) + 1
+    cells = rows * width + cols
+    shape = (len(cohort_periods), width)
+
+    active = np.bincount(cells, minlength=shape[0] * width).reshape(shape).astype(np.float64)
+    amounts = np.bincount(cells, weights=revenue[keep], minlength=shape[0] * width).reshape(shape)
+    cum_amt = np.cumsum(amounts, axis=1)
+
+    # Blank out periods that have not happened yet for each cohort
+    observed = cohort_periods[:, None] + np.arange(width) < activity.num_periods
+    active[~observed] = np.nan
+    cum_amt[~observed] = np.nan
+
+    return CohortMatrix(
+        cohorts=pd.DatetimeIndex(period_start(cohort_periods + activity.first_period, period)),
+        cohort_size=active[:, 0].copy(),
+        users=active,
+        cum_amt=cum_amt
+    )
+
+
+def cohort_range(matrix, start_date=None, end_date=None):
+    """Cohorts first active within [start_date, end_date], shaped like the cohort views.
+
+    The views have no row for a period in which none of a cohort was active, so those
+    cells are left blank, and columns stop at the last period observed for any cohort.
+    """
+    keep = np.ones(len(matrix.cohorts), dtype=bool)
+    if start_date:
+        keep &= matrix.cohorts >= pd.Timestamp(start_date)
+    if end_date:
+        keep &= matrix.cohorts <= pd.Timestamp(end_date)
+
+    users = matrix.users[keep]
+    cum_amt = matrix.cum_amt[keep]
+    inactive = users == 0
+    users = np.where(inactive, np.nan, users)
+    cum_amt = np.where(inactive, np.nan, cum_amt)
+
+    observed = np.flatnonzero(~np.isnan(users).all(axis=0))
+    width = observed[-1] + 1 if len(observed) else 0
+    return CohortMatrix(matrix.cohorts[keep], matrix.cohort_size[keep], users[:, :width], cum_amt[:, :width])
+
+
+def cohort_matrix_from_rows(df, period="month"):
+    """Scatter long-format cohort view rows into a CohortMatrix in one pass"""
+    columns = COHORT_COLUMNS[period]
+    df = df[df[columns["since"]] <= columns["max_periods"]]
+
+    if df.empty:
+        empty = np.empty((0, 0))
+        return CohortMatrix(pd.DatetimeIndex([]), np.empty(0), empty, empty)
+
+    cohorts, rows = np.unique(pd.to_datetime(df[columns["first"]]).to_numpy(), return_inverse=True)
+    rows = rows.ravel()
+    cols = df[columns["since"]].to_numpy(dtype=np.int64)
+    shape = (len(cohorts), int(cols.max()) + 1)
+
+    active = np.full(shape, np.nan)
+    active[rows, cols] = df['users'].to_numpy(dtype=np.float64)
+    cum_amt = np.full(shape, np.nan)
+    cum_amt[rows, cols] = df['cum_amt'].to_numpy(dtype=np.float64)
+    cohort_size = np.zeros(shape[0])
+    cohort_size[rows] = df['cohort_num_users'].to_numpy(dtype=np.float64)
+
+    return CohortMatrix(pd.DatetimeIndex(cohorts), cohort_size, active, cum_amt)
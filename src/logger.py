@@ -9,6 +9,8 @@ class MetricsLogger:
 
     def log_user_action(self, action: str, tab: str, component: str):
         """Log user actions to metrics table"""
+        if self.supabase is None:
+            return None
         try:
             result = self.supabase.table("metrics").insert({
                 "created_at": datetime.now().isoformat(),
@@ -24,6 +26,8 @@ class MetricsLogger:
 
     def log_upload(self, file_size: int, processing_time: float, success: bool, error: str = None):
         """Log file upload metrics"""
+        if self.supabase is None:
+            return None
         try:
             result = self.supabase.table("metrics_uploads").insert({
                 "timestamp": datetime.now().isoformat(),
@@ -43,7 +47,9 @@ class ErrorLogger:
         self.supabase = supabase
     
     def log_error(self, error: Exception, context: dict = None):
-        """Log errors to errors table"""
+        """Log errors to errors table (a no-op without a Supabase connection)"""
+        if self.supabase is None:
+            return None
         try:
             error_data = {
                 "created_at": datetime.now().isoformat(),
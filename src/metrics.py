@@ -4,9 +4,23 @@ from st_supabase_connection import SupabaseConnection
 
 class MetricsLogger:
     def __init__(self, supabase_client: SupabaseConnection):
+        # None when storage is not in Supabase: metrics are then not recorded
         self.client = supabase_client
-        
+
+    def log_user_action(self, action: str, tab: str, component: str):
+        if self.client is None:
+            return
+        self.client.table("metrics").insert({
+            "created_at": datetime.now().isoformat(),
+            "action": action,
+            "tab": tab,
+            "component": component,
+            "session_id": st.session_state.session_id
+        }).execute()
+
     def log_upload(self, file_size: int, processing_time: float, success: bool, error: str = None):
+        if self.client is None:
+            return
         self.client.table("metrics_uploads").insert({
             "timestamp": datetime.now().isoformat(),
             "session_id": st.session_state.session_id,
@@ -0,0 +1,1166 @@
+import hashlib
+import io
+import os
+import sqlite3
+import queue
+import tempfile
+import threading
+import uuid
+import weakref
+from bisect import insort
+from contextlib import contextmanager
+from collections import deque
+from time import monotonic, sleep
+from typing import Dict, List, NamedTuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+import pandas as pd
+import streamlit as st
+from st_supabase_connection import SupabaseConnection, execute_query
+from postgrest.exceptions import APIError
+
+
+class ViewSpec(NamedTuple):
+    """Date column used for filters, ordering and column manifest of a readable view.
+
+    The order columns form a unique key per session, so they double as a seek key.
+    dtypes lists the only columns fetched (what the charts, tables and pagination use)
+    with the dtype each is decoded to.
+    """
+    date_column: str
+    order: List[str]
+    dtypes: Dict[str, str]
+    desc: bool = False
+
+    @property
+    def columns(self):
+        return list(self.dtypes)
+
+
+DATE = "datetime64"
+COUNT = "int64"
+AMOUNT = "float64"
+
+GROWTH_COLUMNS = {"new": COUNT, "retained": COUNT, "resurrected": COUNT, "churned": COUNT}
+REVENUE_COLUMNS = {
+    "rev": AMOUNT, "retained": AMOUNT, "new": AMOUNT, "expansion": AMOUNT,
+    "resurrected": AMOUNT, "contraction": AMOUNT, "churned": AMOUNT
+}
+COHORT_VALUE_COLUMNS = {"users": COUNT, "cohort_num_users": COUNT, "cum_amt": AMOUNT}
+
+# Every view the app reads, shared by all backends
+VIEWS = {
+    "revenue_data": ViewSpec(
+        "transaction_date", ["transaction_date", "transaction_id"],
+        {"transaction_date": DATE, "transaction_id": "str", "revenue": AMOUNT, "user_id": "str"},
+        desc=True
+    ),
+    "mau_view": ViewSpec("month", ["month"], {"month": DATE, "mau": COUNT, **GROWTH_COLUMNS}),
+    "wau_view": ViewSpec("week", ["week"], {"week": DATE, "wau": COUNT, **GROWTH_COLUMNS}),
+    "dau_view": ViewSpec("day", ["day"], {"day": DATE, "dau": COUNT, **GROWTH_COLUMNS}),
+    "mrr_view": ViewSpec("month", ["month"], {"month": DATE, **REVENUE_COLUMNS}),
+    "wrr_view": ViewSpec("week", ["week"], {"week": DATE, **REVENUE_COLUMNS}),
+    "drr_view": ViewSpec("day", ["day"], {"day": DATE, **REVENUE_COLUMNS}),
+    "monthly_retention_view": ViewSpec("month", ["month"], {"month": DATE, "retention_rate": AMOUNT}),
+    "weekly_retention_view": ViewSpec("week", ["week"], {"week": DATE, "retention_rate": AMOUNT}),
+    "daily_retention_view": ViewSpec("day", ["day"], {"day": DATE, "retention_rate": AMOUNT}),
+    "monthly_revenue_retention_view": ViewSpec("month", ["month"], {"month": DATE, "retention_rate": AMOUNT}),
+    "weekly_revenue_retention_view": ViewSpec("week", ["week"], {"week": DATE, "retention_rate": AMOUNT}),
+    "daily_revenue_retention_view": ViewSpec("day", ["day"], {"day": DATE, "retention_rate": AMOUNT}),
+    "monthly_quick_ratio_view": ViewSpec("month", ["month"], {"month": DATE, "quick_ratio": AMOUNT}),
+    "weekly_quick_ratio_view": ViewSpec("week", ["week"], {"week": DATE, "quick_ratio": AMOUNT}),
+    "daily_quick_ratio_view": ViewSpec("day", ["day"], {"day": DATE, "quick_ratio": AMOUNT}),
+    "monthly_revenue_quick_ratio_view": ViewSpec("month", ["month"], {"month": DATE, "quick_ratio": AMOUNT}),
+    "weekly_revenue_quick_ratio_view": ViewSpec("week", ["week"], {"week": DATE, "quick_ratio": AMOUNT}),
+    "daily_revenue_quick_ratio_view": ViewSpec("day", ["day"], {"day": DATE, "quick_ratio": AMOUNT}),
+    "monthly_cohorts_view": ViewSpec(
+        "first_month", ["first_month", "active_month"],
+        {"first_month": DATE, "active_month": DATE, "months_since_first": COUNT, **COHORT_VALUE_COLUMNS}
+    ),
+    "weekly_cohorts_view": ViewSpec(
+        "first_week", ["first_week", "active_week"],
+        {"first_week": DATE, "active_week": DATE, "weeks_since_first": COUNT, **COHORT_VALUE_COLUMNS}
+    ),
+    "daily_cohorts_view": ViewSpec(
+        "first_dt", ["first_dt", "active_day"],
+        {"first_dt": DATE, "active_day": DATE, "days_since_first": COUNT, **COHORT_VALUE_COLUMNS}
+    ),
+}
+
+
+class QueryResult(NamedTuple):
+    """A view's typed frame, built once per fetch and shared read-only by the visuals"""
+    data: pd.DataFrame
+
+
+def naive_datetimes(values):
+    """Datetime series at ns resolution without a time zone.
+
+    Zone-aware values (e.g. a timestamptz column) keep their wall-clock time, so each
+    row keeps the date the view reported for it.
+    """
+    values = pd.to_datetime(values)
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    return values.astype('datetime64[ns]')
+
+
+def typed_frame(view, frame):
+    """Cast decoded view columns to the manifest dtypes"""
+    columns = {}
+    for column, dtype in VIEWS[view].dtypes.items():
+        values = frame[column]
+        if dtype == DATE:
+            # One resolution and no zone, whichever source parsed the dates
+            columns[column] = naive_datetimes(values)
+        elif dtype == COUNT and values.isna().any():
+            # Keep gaps as NaN rather than failing the whole read
+            columns[column] = values.astype(AMOUNT)
+        else:
+            columns[column] = values.astype(dtype)
+    return pd.DataFrame(columns)
+
+
+def iso_dates(days):
+    """YYYY-MM-DD strings of an upload's date column (day ordinals since 1970-01-01)"""
+    return np.asarray(days).astype('datetime64[D]').astype(str)
+
+
+def text_or_null(column):
+    """Column values as strings for a text array parameter, None where null (not 'nan')"""
+    return column.astype(str).astype(object).where(column.notna(), None).tolist()
+
+
+class ReadCancelled(Exception):
+    """A view read was stopped because its cancel event was set"""
+
+
+def check_cancelled(cancelled):
+    """Raise ReadCancelled if the event (or None, never) is set; call before each round trip"""
+    if cancelled is not None and cancelled.is_set():
+        raise ReadCancelled()
+
+
+def fetch_paginated(fetch_page, page_size=1000, max_workers=4):
+    """Read every page of a result set, fetching the pages after the first concurrently.
+
+    fetch_page(start, end, count=False) runs one ranged query and returns its response.
+    The first page also asks for the exact row count, so the remaining ranges are known
+    up front; they are fetched by a bounded pool and reassembled in order. Without a
+    count it falls back to reading pages one by one until a short page.
+    """
+    first = fetch_page(0, page_size - 1, count=True)
+    rows = list(first.data or [])
+    total = getattr(first, 'count', None)
+
+    if total is None:
+        start = page_size
+        page = rows
+        while len(page) == page_size:
+            page = fetch_page(start, start + page_size - 1).data or []
+            rows.extend(page)
+            start += page_size
+        return rows
+
+    starts = range(page_size, total, page_size)
+    if starts:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(starts))) as executor:
+            pages = executor.map(lambda start: fetch_page(start, start + page_size - 1).data, starts)
+            for page in pages:
+                rows.extend(page)
+    return rows
+
+
+def fetch_keyset(fetch_page, order, page_size=1000):
+    """Read every page by seeking past the last row's ordering key instead of an offset.
+
+    fetch_page(after, limit) returns up to limit rows ordered by order, starting after
+    the key tuple after (None for the first page). Each page costs the same however
+    deep it is, and rows are not skipped or repeated if the view changes mid-read.
+    """
+    rows = []
+    after = None
+
+    while True:
+        page = fetch_page(after, page_size).data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after = tuple(page[-1][column] for column in order)
+
+
+class AIMDController:
+    """Additive-increase, multiplicative-decrease control of upload batch size and concurrency.
+
+    A batch that lands within target_latency grows the next batches by batch_step rows,
+    and each window of such batches adds one in-flight slot. A slow batch halves the
+    batch size. A failure (error, throttling or timeout) halves both and pauses new
+    submissions for a cooldown that doubles while failures continue. The rate settles
+    just below what the backend sustains.
+    """
+
+    def __init__(self, batch_size, min_batch, max_batch, batch_step,
+                 concurrency=2, max_concurrency=8, target_latency=2.0, cooldown=0.5, max_cooldown=8.0):
+        self.batch_size = batch_size
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.batch_step = batch_step
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.successes = 0
+        self.failures = 0
+        self.resume_at = 0.0
+
+    def on_success(self, latency):
+        self.failures = 0
+        if latency > self.target_latency:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+            return
+
+        self.batch_size = min(self.max_batch, self.batch_size + self.batch_step)
+        self.successes += 1
+        if self.successes >= self.concurrency:
+            self.successes = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def on_failure(self):
+        self.failures += 1
+        self.successes = 0
+        self.batch_size = max(self.min_batch, self.batch_size // 2)
+        self.concurrency = max(1, self.concurrency // 2)
+        self.resume_at = monotonic() + min(self.max_cooldown, self.cooldown * 2 ** (self.failures - 1))
+
+    def pause(self):
+        """Seconds to hold off new submissions after a failure"""
+        return max(0.0, self.resume_at - monotonic())
+
+
+class UploadJob:
+    """Checkpoints of one upload: which row ranges of its data are stored.
+
+    Identified by a fingerprint of the data, so only a retry of the same upload
+    resumes it. Ranges are half-open [start, end) row positions. A streamed upload's
+    total_rows is None until its stream has been read to the end.
+    """
+
+    def __init__(self, fingerprint, total_rows=None):
+        self.job_id = uuid.uuid4().hex
+        self.fingerprint = fingerprint
+        self.total_rows = total_rows
+        self.done = []
+        # Row position -> error, for rows that could not be stored on the last run
+        self.failed = {}
+
+    @classmethod
+    def of_frame(cls, df):
+        """A job for the rows of df"""
+        return cls(cls.fingerprint_of(df), len(df))
+
+    @staticmethod
+    def fingerprint_of(df):
+        # Order matters: checkpoints are row positions
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return len(df), hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+    def matches(self, df):
+        return self.fingerprint == self.fingerprint_of(df)
+
+    def mark_done(self, start, end):
+        insort(self.done, (start, end))
+        merged = []
+        for range_start, range_end in self.done:
+            if merged and range_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        self.done = merged
+
+    def gaps(self, start=0, end=None):
+        """Row ranges within [start, end) still to be stored, in order (end defaults to total_rows)"""
+        end = self.total_rows if end is None else end
+        gaps = []
+        position = start
+        for done_start, done_end in self.done:
+            if done_start > position:
+                gaps.append((position, min(done_start, end)))
+            position = max(position, done_end)
+            if position >= end:
+                break
+        if position < end:
+            gaps.append((position, end))
+        return gaps
+
+    @property
+    def stored(self):
+        return sum(end - start for start, end in self.done)
+
+    @property
+    def complete(self):
+        return self.stored == self.total_rows
+
+
+def _is_data_error(e):
+    # SQLSTATE classes 22 (data exception) and 23 (integrity): retrying cannot help
+    return isinstance(e, APIError) and str(e.code or "")[:2] in ("22", "23")
+
+
+def row_batches(chunks, job, controller):
+    """(first row position, batch) of the rows job has not stored, from consecutive frames.
+
+    Positions count from the first row of the first chunk, so checkpoints hold across
+    chunk boundaries. Batches are sliced at the controller's current size as they are
+    taken and never span chunks. Chunks already stored are still read, to count their
+    rows, but yield nothing. Sets job.total_rows once the chunks are exhausted.
+    """
+    position = 0
+    for chunk in chunks:
+        chunk_start = position
+        position += len(chunk)
+        for start, end in job.gaps(chunk_start, position):
+            while start < end:
+                stop = min(end, start + controller.batch_size)
+                yield start, chunk[start - chunk_start:stop - chunk_start]
+                start = stop
+    job.total_rows = position
+
+
+def pipelined_upload(write_batch, batches, job, executor, controller, on_progress=None, max_attempts=5):
+    """Write batches (row_batches over the data) on a long-lived executor, checkpointing them in job.
+
+    Batches are taken as they are submitted, while fewer than controller.concurrency
+    are outstanding. write_batch(start, batch) gets each batch with its first row
+    position. Stored batches are checkpointed in job, so a later call with a fresh
+    row_batches only sends the gaps. A failed batch is resubmitted after the
+    controller's cooldown; after max_attempts the upload stops once running batches
+    finish, keeping its checkpoints for a retry. A batch rejected for its data is
+    split in half instead, down to single rows, to isolate bad rows. Those are left
+    out while the rest is stored, then the upload raises naming them: only a changed
+    file can fix them, and a changed file does not resume. An error from
+    batches itself (e.g. a chunk that cannot be parsed) also stops the upload.
+    on_progress(rows) runs on the calling thread with the rows stored so far.
+    """
+    def timed(start, batch):
+        started = monotonic()
+        write_batch(start, batch)
+        return monotonic() - started
+
+    batches = iter(batches)
+    exhausted = False
+    retries = deque()
+    in_flight = {}
+    stopped = []
+    source_errors = []
+    job.failed = {}
+
+    def settle(timeout=None):
+        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            start, batch, attempt = in_flight.pop(future)
+            try:
+                latency = future.result()
+            except Exception as e:
+                if not _is_data_error(e):
+                    controller.on_failure()
+                    if attempt + 1 < max_attempts:
+                        retries.append((start, batch, attempt + 1))
+                    else:
+                        # Not the rows' fault, so splitting would not help
+                        stopped.append(f"rows {start + 1}-{start + len(batch)}: {str(e)}")
+                elif len(batch) > 1:
+                    half = len(batch) // 2
+                    retries.append((start, batch[:half], attempt))
+                    retries.append((start + half, batch[half:], attempt))
+                else:
+                    job.failed[start] = str(e)
+                continue
+
+            controller.on_success(latency)
+            job.mark_done(start, start + len(batch))
+        if done and on_progress:
+            on_progress(job.stored)
+
+    while not exhausted or retries or in_flight:
+        if stopped or source_errors:
+            # Let running batches land so their checkpoints are kept
+            exhausted = True
+            retries.clear()
+            if in_flight:
+                settle()
+            continue
+
+        pause = controller.pause()
+        if (exhausted and not retries) or pause or len(in_flight) >= controller.concurrency:
+            if in_flight:
+                settle(pause or None)
+            else:
+                sleep(pause)
+            continue
+
+        if retries:
+            start, batch, attempt = retries.popleft()
+        else:
+            try:
+                start, batch = next(batches)
+            except StopIteration:
+                exhausted = True
+                continue
+            except Exception as e:
+                source_errors.append(e)
+                continue
+            attempt = 0
+        in_flight[executor.submit(timed, start, batch)] = (start, batch, attempt)
+
+    if source_errors:
+        raise source_errors[0]
+
+    if stopped:
+        saved = f"{job.stored:,}" if job.total_rows is None else f"{job.stored:,} of {job.total_rows:,}"
+        raise Exception(
+            f"Upload stopped at {stopped[0]}. {saved} rows "
+            "are saved; retry to upload only what is missing."
+        )
+
+    if job.failed:
+        rows = sorted(job.failed)
+        listed = ", ".join(str(row + 1) for row in rows[:10]) + (", ..." if len(rows) > 10 else "")
+        raise Exception(
+            f"{len(rows)} rows could not be stored (rows {listed}): {job.failed[rows[0]]}. "
+            "Fix these rows and upload the file again; as changed data, it is stored from scratch."
+        )
+    return job.stored
+
+
+def decode_csv(text, view):
+    """Parse a view_csv document (sql/view_csv.sql) straight into typed columns.
+
+    Text columns are read as written: no number inference ("007" stays "007") and only
+    empty cells, which view_csv writes for nulls, are missing ("NA" is a value).
+    """
+    text_columns = {column: str for column, dtype in VIEWS[view].dtypes.items() if dtype == "str"}
+    frame = pd.read_csv(io.StringIO(text), dtype=text_columns, keep_default_na=False, na_values=[''])
+    return typed_frame(view, frame)
+
+
+def keyset_filter(order, after, desc=False):
+    """PostgREST or= expression selecting rows after a composite key, e.g. for (a, b):
+    a.gt.x,and(a.eq.x,b.gt.y)"""
+    op = "lt" if desc else "gt"
+    values = [f'"{value}"' for value in after]
+    terms = []
+    for i, column in enumerate(order):
+        conditions = [f"{c}.eq.{v}" for c, v in zip(order[:i], values[:i])]
+        conditions.append(f"{column}.{op}.{values[i]}")
+        terms.append(conditions[0] if i == 0 else f"and({','.join(conditions)})")
+    return ",".join(terms)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable connections with health checks.
+
+    Connections are made on demand up to size and lent to one caller at a time, so
+    each keeps its HTTP session (and TLS) alive across requests and threads. One idle
+    for longer than check_interval is probed with check(conn) before it is lent again;
+    one that fails the probe, or raises anything but an API error while lent, is
+    dropped and replaced by a fresh connection.
+    """
+
+    def __init__(self, connect, check, size=8, check_interval=60):
+        self.connect = connect
+        self.check = check
+        self.check_interval = check_interval
+        self.slots = threading.BoundedSemaphore(size)
+        # Most recently returned first, so the warmest connections are reused
+        self.idle = queue.LifoQueue()
+
+    def _checkout(self):
+        while True:
+            try:
+                returned_at, conn = self.idle.get_nowait()
+            except queue.Empty:
+                return self.connect()
+
+            if monotonic() - returned_at < self.check_interval:
+                return conn
+            try:
+                self.check(conn)
+                return conn
+            except Exception:
+                continue
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, blocking while all of them are in use"""
+        self.slots.acquire()
+        try:
+            conn = self._checkout()
+            healthy = True
+            try:
+                yield conn
+            except APIError:
+                # The server answered, so the connection itself is fine
+                raise
+            except Exception:
+                healthy = False
+                raise
+            finally:
+                if healthy:
+                    self.idle.put((monotonic(), conn))
+        finally:
+            self.slots.release()
+
+
+class StorageBackend:
+    """Where uploaded transactions live and where the growth views are read from"""
+
+    def ingest(self, df, session_id, on_progress=None, job=None):
+        """Store uploaded transactions (date, id, revenue, user_id) as parsed by upload.py.
+
+        job (an UploadJob for df) records which rows are stored, so calling again with
+        the same job resumes an interrupted upload. on_progress(rows), if given, is
+        called on the calling thread with the rows stored so far.
+        """
+        return self.ingest_chunks([df], session_id, job or UploadJob.of_frame(df), on_progress)
+
+    def ingest_chunks(self, chunks, session_id, job, on_progress=None):
+        """Store transactions arriving as consecutive frames, as one upload checkpointed in job.
+
+        Rows are numbered across chunks, so retrying with the same job and the same
+        chunks skips the rows already stored. Returns the total row count.
+        """
+        raise NotImplementedError
+
+    def clear(self, session_id):
+        """Delete a session's transactions, returning None if there was nothing to delete"""
+        raise NotImplementedError
+
+    # Granularities whose views need a refresh after ingest ('daily', 'weekly', 'monthly')
+    refresh_granularities = []
+
+    def refresh_granularity(self, session_id, granularity):
+        """Bring one granularity's views up to date, returning once they are readable"""
+        raise NotImplementedError
+
+    def read_view(self, view, session_id, start_date=None, end_date=None, cancelled=None):
+        """Read a view's manifest columns for a session as a DataFrame, in VIEWS order.
+
+        Once cancelled (a threading.Event) is set, the read raises ReadCancelled before
+        its next page or call, freeing connections for other reads.
+        """
+        raise NotImplementedError
+
+    def read_snapshot(self, period, views, session_id, start_date=None, end_date=None, cancelled=None):
+        """Read a period's views ({entry: view}) in one call as a dict of frames per entry.
+
+        Returns None when the backend has no bundled read, so callers read view by view.
+        cancelled works as for read_view.
+        """
+        return None
+
+
+class SupabaseBackend(StorageBackend):
+    """Transactions in Supabase, views served by Postgres through PostgREST"""
+
+    page_size = 1000
+    fetch_workers = 4
+    # Starting batch sizes; the upload controller adapts them from there
+    batch_size = 1000
+    bulk_batch_size = 10000
+    upload_workers = 8
+    # Enough for the upload workers and the concurrent view reads at once
+    pool_size = 12
+    # Materialized views are refreshed through refresh_period_views, Monthly's first as
+    # the Visualize tab opens on it
+    refresh_granularities = ['monthly', 'weekly', 'daily']
+
+    def __init__(self, pagination="offset", wire_format="json"):
+        # "offset" fetches ranged pages concurrently, "keyset" seeks past the last key
+        self.pagination = pagination
+        # "json" reads row objects through PostgREST, "csv" one columnar document per view
+        self.wire_format = wire_format
+        # Cleared if the period_snapshot / view_csv functions (sql/) are not deployed
+        self.snapshot_available = True
+        self.csv_available = True
+        # Cleared if refresh_period_views (sql/refresh_period_views.sql) is not deployed
+        self.refresh_available = True
+        # Whether load_revenue_batch (sql/load_revenue_batch.sql) exists, probed on first upload
+        self.bulk_available = None
+        # Upload workers live as long as the backend and are shared by every upload;
+        # each upload's controller decides how many of them it keeps busy
+        self.upload_pool = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="upload")
+        self.pool = ConnectionPool(
+            lambda: SupabaseConnection("supabase"), self._check_connection, self.pool_size
+        )
+
+    def _check_connection(self, conn):
+        # Cheapest round trip through PostgREST: an empty page
+        execute_query(conn.table("revenue_data").select("session_id").limit(0), ttl=0)
+
+    def connection(self):
+        """Borrow a pooled connection (a context manager), safe from any thread"""
+        return self.pool.connection()
+
+    def _load_batch(self, batch, session_id, job_id, first_row):
+        """Insert a batch in one statement through load_revenue_batch.
+
+        Columns travel as parallel arrays rather than one JSON object per row, and the
+        session is cleared before uploads, so no upsert conflict checks are needed.
+        The server checkpoints (job_id, first_row, rows), so resending is a no-op.
+        Returns None if the function is not deployed.
+        """
+        return self._rpc("load_revenue_batch", {
+            "p_session_id": session_id,
+            "p_job_id": job_id,
+            "p_first_row": first_row,
+            "p_dates": iso_dates(batch['date']).tolist(),
+            "p_ids": text_or_null(batch['id']),
+            "p_revenue": text_or_null(batch['revenue']),
+            "p_users": text_or_null(batch['user_id'])
+        })
+
+    def _ingest_batch(self, df_chunk, session_id, job_id, first_row):
+        """Insert a single batch of data.
+
+        Failures are not retried here: the upload controller backs off and resubmits.
+        Upserts make the fallback path idempotent as well.
+        """
+        if self.bulk_available:
+            result = self._load_batch(df_chunk, session_id, job_id, first_row)
+            if result is not None:
+                return result
+            # The function is gone, upsert rows from now on
+            self.bulk_available = False
+
+        # Prepare data
+        df_chunk = df_chunk.copy()
+        df_chunk = df_chunk.rename(columns={
+            'date': 'transaction_date',
+            'id': 'transaction_id'
+        })
+        df_chunk['transaction_date'] = iso_dates(df_chunk['transaction_date'])
+        df_chunk['session_id'] = session_id  # Use passed session_id
+
+        # Insert data, blank cells as JSON nulls
+        records = df_chunk.astype(object).where(df_chunk.notna(), None).to_dict('records')
+        with self.connection() as conn:
+            return execute_query(
+                conn.table("revenue_data").upsert(records),
+                ttl=0
+            )
+
+    def ingest_chunks(self, chunks, session_id, job, on_progress=None):
+        if self.bulk_available is None:
+            # An empty load inserts nothing but shows whether the function is deployed
+            empty = pd.DataFrame({'date': np.array([], np.int32), 'id': [], 'revenue': [], 'user_id': []})
+            self.bulk_available = self._load_batch(empty, session_id, job.job_id, 0) is not None
+
+        batch_size = self.bulk_batch_size if self.bulk_available else self.batch_size
+        controller = AIMDController(
+            batch_size,
+            min_batch=batch_size // 10,
+            max_batch=batch_size * 4,
+            batch_step=batch_size // 2,
+            max_concurrency=self.upload_workers
+        )
+        pipelined_upload(
+            lambda start, batch: self._ingest_batch(batch, session_id, job.job_id, start),
+            row_batches(chunks, job, controller),
+            job,
+            self.upload_pool,
+            controller,
+            on_progress
+        )
+        return job.total_rows
+
+    def clear(self, session_id):
+        # Checkpoints of the session's uploads go with its rows, so they do not pile up
+        self._clear_checkpoints(session_id)
+        with self.connection() as conn:
+            # First verify the session exists
+            result = execute_query(
+                conn.table("revenue_data")
+                .select("count")  # Use PostgreSQL count
+                .eq('session_id', session_id),
+                ttl=0
+            )
+
+            if result.data:
+                # Execute delete with explicit session check
+                return execute_query(
+                    conn.table("revenue_data")
+                    .delete()
+                    .eq('session_id', session_id),
+                    ttl=0
+                )
+            return None
+
+    def _clear_checkpoints(self, session_id):
+        if self.bulk_available is False:
+            return
+        try:
+            with self.connection() as conn:
+                execute_query(conn.table("upload_checkpoints").delete().eq('session_id', session_id), ttl=0)
+        except APIError as e:
+            # PGRST205: table not found, load_revenue_batch.sql is not deployed
+            if e.code != "PGRST205":
+                raise
+
+    def refresh_granularity(self, session_id, view_name):
+        # refresh_period_views (sql/refresh_period_views.sql) refreshes the views within
+        # the call, so its response means they are readable
+        if self.refresh_available:
+            if self._rpc("refresh_period_views", {"p_granularity": view_name}) is not None:
+                return
+            self.refresh_available = False
+
+        # Without it, completion rests on the refresh_trigger trigger refreshing
+        # synchronously, which nothing here can check
+        with self.connection() as conn:
+            execute_query(
+                conn.table("refresh_trigger")
+                .insert({
+                    "created_at": "now()",
+                    "view_name": view_name,
+                    "session_id": session_id
+                }),
+                ttl=0
+            )
+
+    def _view_query(self, conn, view, session_id, start_date=None, end_date=None, count=None):
+        """Build a fresh filtered, ordered query (builders mutate as they are chained)"""
+        spec = VIEWS[view]
+        query = conn.table(view).select(",".join(spec.columns), count=count).eq('session_id', session_id)
+
+        # Apply date filters if they exist
+        if start_date:
+            query = query.gte(spec.date_column, start_date.strftime('%Y-%m-%d'))
+        if end_date:
+            query = query.lte(spec.date_column, end_date.strftime('%Y-%m-%d'))
+
+        for column in spec.order:
+            query = query.order(column, desc=spec.desc)
+        return query
+
+    def _rpc(self, function, params):
+        """Call a database function, or return None if it is not deployed"""
+        try:
+            with self.connection() as conn:
+                return execute_query(conn.client.rpc(function, params), ttl=0).data
+        except APIError as e:
+            # PGRST202: function not found
+            if e.code == "PGRST202":
+                return None
+            raise
+
+    def read_view(self, view, session_id, start_date=None, end_date=None, cancelled=None):
+        spec = VIEWS[view]
+
+        if self.wire_format == "csv" and self.csv_available:
+            check_cancelled(cancelled)
+            text = self._rpc("view_csv", {
+                "p_session_id": session_id,
+                "p_view": view,
+                "p_columns": spec.columns,
+                "p_date_column": spec.date_column,
+                "p_order": spec.order,
+                "p_desc": spec.desc,
+                "p_start": start_date.strftime('%Y-%m-%d') if start_date else None,
+                "p_end": end_date.strftime('%Y-%m-%d') if end_date else None
+            })
+            if text is not None:
+                return decode_csv(text, view)
+            # Fall back to JSON reads from now on
+            self.csv_available = False
+
+        rows = self._read_rows(view, session_id, start_date, end_date, cancelled)
+        return typed_frame(view, pd.DataFrame(rows, columns=spec.columns))
+
+    def _read_rows(self, view, session_id, start_date=None, end_date=None, cancelled=None):
+        """Every row of a view as PostgREST JSON objects, page by page.
+
+        Each page borrows its own pooled connection, so concurrent pages never share one,
+        and checks cancelled before it does.
+        """
+        if self.pagination == "keyset":
+            spec = VIEWS[view]
+
+            def fetch_after(after, limit):
+                check_cancelled(cancelled)
+                with self.connection() as conn:
+                    query = self._view_query(conn, view, session_id, start_date, end_date)
+                    if after is not None:
+                        query = query.or_(keyset_filter(spec.order, after, spec.desc))
+                    return execute_query(query.limit(limit), ttl=0)
+
+            return fetch_keyset(fetch_after, spec.order, self.page_size)
+
+        def fetch_page(start, end, count=False):
+            check_cancelled(cancelled)
+            with self.connection() as conn:
+                query = self._view_query(
+                    conn, view, session_id, start_date, end_date,
+                    count="exact" if count else None
+                )
+                return execute_query(query.range(start, end), ttl=0)
+
+        return fetch_paginated(fetch_page, self.page_size, self.fetch_workers)
+
+    def read_snapshot(self, period, views, session_id, start_date=None, end_date=None, cancelled=None):
+        if not self.snapshot_available:
+            return None
+
+        check_cancelled(cancelled)
+        wire_format = "csv" if self.wire_format == "csv" and self.csv_available else "json"
+        snapshot = self._rpc("period_snapshot", {
+            "p_session_id": session_id,
+            "p_period": period,
+            "p_columns": {key: VIEWS[view].columns for key, view in views.items()},
+            "p_start": start_date.strftime('%Y-%m-%d') if start_date else None,
+            "p_end": end_date.strftime('%Y-%m-%d') if end_date else None,
+            "p_format": wire_format
+        })
+        if snapshot is None:
+            # Fall back to per-view reads from now on
+            self.snapshot_available = False
+            return None
+
+        if wire_format == "csv":
+            return {key: decode_csv(snapshot[key], view) for key, view in views.items()}
+        return {
+            key: typed_frame(view, pd.DataFrame(snapshot[key], columns=VIEWS[view].columns))
+            for key, view in views.items()
+        }
+
+
+# SQLite expressions for the start of each period and for stepping between periods.
+# Weeks start on Sunday: strftime('%w') is 0 on Sundays.
+_SQLITE_PERIODS = {
+    "month": {
+        "start": "date({col}, 'start of month')",
+        "step": "'{sign}1 month'",
+        "since": "((CAST(strftime('%Y', {active}) AS INTEGER) - CAST(strftime('%Y', {first}) AS INTEGER)) * 12"
+                 " + CAST(strftime('%m', {active}) AS INTEGER) - CAST(strftime('%m', {first}) AS INTEGER))",
+        "views": {"growth": "mau_view", "total": "mau", "revenue": "mrr_view", "prefix": "monthly"},
+        "cohort": ("first_month", "active_month", "months_since_first", 24),
+    },
+    "week": {
+        "start": "date({col}, '-' || strftime('%w', {col}) || ' days')",
+        "step": "'{sign}7 days'",
+        "since": "CAST(ROUND((julianday({active}) - julianday({first})) / 7) AS INTEGER)",
+        "views": {"growth": "wau_view", "total": "wau", "revenue": "wrr_view", "prefix": "weekly"},
+        "cohort": ("first_week", "active_week", "weeks_since_first", 52),
+    },
+    "day": {
+        "start": "date({col})",
+        "step": "'{sign}1 day'",
+        "since": "CAST(ROUND(julianday({active}) - julianday({first})) AS INTEGER)",
+        "views": {"growth": "dau_view", "total": "dau", "revenue": "drr_view", "prefix": "daily"},
+        "cohort": ("first_dt", "active_day", "days_since_first", 90),
+    },
+}
+
+
+def _sqlite_view_ddl(period):
+    """CREATE VIEW statements for one period, mirroring the Postgres views"""
+    spec = _SQLITE_PERIODS[period]
+    views = spec["views"]
+    start = spec["start"].format(col="transaction_date")
+    prev = spec["step"].format(sign="-")
+    nxt = spec["step"].format(sign="+")
+    first_col, active_col, since_col, max_periods = spec["cohort"]
+    since = spec["since"].format(active="c.active_period", first="c.first_period")
+
+    # Per-user activity per period with the user's neighbouring periods
+    activity = f"""
+        activity AS (
+            SELECT session_id, user_id, {start} AS period, SUM(revenue) AS revenue
+            FROM revenue_data
+            GROUP BY session_id, user_id, period
+        ),
+        flagged AS (
+            SELECT *,
+                LAG(period) OVER w AS prev_period,
+                LAG(revenue) OVER w AS prev_revenue,
+                LEAD(period) OVER w AS next_period
+            FROM activity
+            WINDOW w AS (PARTITION BY session_id, user_id ORDER BY period)
+        ),
+        bounds AS (
+            SELECT session_id, MIN(period) AS period, MAX(period) AS last_period
+            FROM activity
+            GROUP BY session_id
+        ),
+        periods(session_id, period, last_period) AS (
+            SELECT session_id, period, last_period FROM bounds
+            UNION ALL
+            SELECT session_id, date(period, {nxt}), last_period
+            FROM periods
+            WHERE period < last_period
+        ),
+        churn AS (
+            SELECT session_id, date(period, {nxt}) AS period,
+                COUNT(*) AS users, SUM(revenue) AS revenue
+            FROM flagged
+            WHERE next_period IS NULL OR next_period <> date(period, {nxt})
+            GROUP BY session_id, date(period, {nxt})
+        )"""
+
+    growth = f"""
+        CREATE VIEW IF NOT EXISTS {views['growth']} AS
+        WITH {activity},
+        counts AS (
+            SELECT session_id, period,
+                COUNT(CASE WHEN prev_period IS NULL THEN 1 END) AS new,
+                COUNT(CASE WHEN prev_period = date(period, {prev}) THEN 1 END) AS retained,
+                COUNT(CASE WHEN prev_period <> date(period, {prev}) THEN 1 END) AS resurrected
+            FROM flagged
+            GROUP BY session_id, period
+        )
+        SELECT p.session_id, p.period AS {period},
+            COALESCE(c.new + c.retained + c.resurrected, 0) AS {views['total']},
+            COALESCE(c.new, 0) AS new,
+            COALESCE(c.retained, 0) AS retained,
+            COALESCE(c.resurrected, 0) AS resurrected,
+            -COALESCE(ch.users, 0) AS churned
+        FROM periods p
+        LEFT JOIN counts c ON c.session_id = p.session_id AND c.period = p.period
+        LEFT JOIN churn ch ON ch.session_id = p.session_id AND ch.period = p.period"""
+
+    revenue = f"""
+        CREATE VIEW IF NOT EXISTS {views['revenue']} AS
+        WITH {activity},
+        components AS (
+            SELECT session_id, period,
+                SUM(revenue) AS rev,
+                SUM(CASE WHEN prev_period = date(period, {prev})
+                    THEN MIN(revenue, prev_revenue) ELSE 0 END) AS retained,
+                SUM(CASE WHEN prev_period IS NULL THEN revenue ELSE 0 END) AS new,
+                SUM(CASE WHEN prev_period = date(period, {prev})
+                    THEN MAX(revenue - prev_revenue, 0) ELSE 0 END) AS expansion,
+                SUM(CASE WHEN prev_period <> date(period, {prev}) THEN revenue ELSE 0 END) AS resurrected,
+                SUM(CASE WHEN prev_period = date(period, {prev})
+                    THEN MAX(prev_revenue - revenue, 0) ELSE 0 END) AS contraction
+            FROM flagged
+            GROUP BY session_id, period
+        )
+        SELECT p.session_id, p.period AS {period},
+            COALESCE(c.rev, 0) AS rev,
+            COALESCE(c.retained, 0) AS retained,
+            COALESCE(c.new, 0) AS new,
+            COALESCE(c.expansion, 0) AS expansion,
+            COALESCE(c.resurrected, 0) AS resurrected,
+            -COALESCE(c.contraction, 0) AS contraction,
+            -COALESCE(ch.revenue, 0) AS churned
+        FROM periods p
+        LEFT JOIN components c ON c.session_id = p.session_id AND c.period = p.period
+        LEFT JOIN churn ch ON ch.session_id = p.session_id AND ch.period = p.period"""
+
+    retention = f"""
+        CREATE VIEW IF NOT EXISTS {views['prefix']}_retention_view AS
+        SELECT session_id, {period}, retained * 100.0 / previous AS retention_rate
+        FROM (
+            SELECT *, LAG({views['total']}) OVER (PARTITION BY session_id ORDER BY {period}) AS previous
+            FROM {views['growth']}
+        )
+        WHERE previous > 0"""
+
+    revenue_retention = f"""
+        CREATE VIEW IF NOT EXISTS {views['prefix']}_revenue_retention_view AS
+        SELECT session_id, {period}, retained * 100.0 / previous AS retention_rate
+        FROM (
+            SELECT *, LAG(rev) OVER (PARTITION BY session_id ORDER BY {period}) AS previous
+            FROM {views['revenue']}
+        )
+        WHERE previous > 0"""
+
+    quick_ratio = f"""
+        CREATE VIEW IF NOT EXISTS {views['prefix']}_quick_ratio_view AS
+        SELECT session_id, {period}, (new + resurrected) * 1.0 / -churned AS quick_ratio
+        FROM {views['growth']}
+        WHERE churned < 0"""
+
+    revenue_quick_ratio = f"""
+        CREATE VIEW IF NOT EXISTS {views['prefix']}_revenue_quick_ratio_view AS
+        SELECT session_id, {period},
+            (new + resurrected + expansion) / -(churned + contraction) AS quick_ratio
+        FROM {views['revenue']}
+        WHERE churned + contraction < 0"""
+
+    cohorts = f"""
+        CREATE VIEW IF NOT EXISTS {views['prefix']}_cohorts_view AS
+        WITH activity AS (
+            SELECT session_id, user_id, {start} AS period, SUM(revenue) AS revenue
+            FROM revenue_data
+            GROUP BY session_id, user_id, period
+        ),
+        firsts AS (
+            SELECT session_id, user_id, MIN(period) AS first_period
+            FROM activity
+            GROUP BY session_id, user_id
+        ),
+        sizes AS (
+            SELECT session_id, first_period, COUNT(*) AS cohort_num_users
+            FROM firsts
+            GROUP BY session_id, first_period
+        ),
+        cells AS (
+            SELECT a.session_id, f.first_period, a.period AS active_period,
+                COUNT(*) AS users, SUM(a.revenue) AS amt
+            FROM activity a
+            JOIN firsts f ON f.session_id = a.session_id AND f.user_id = a.user_id
+            GROUP BY a.session_id, f.first_period, a.period
+        ),
+        cumulative AS (
+            SELECT c.*, s.cohort_num_users, {since} AS periods_since,
+                SUM(c.amt) OVER (
+                    PARTITION BY c.session_id, c.first_period ORDER BY c.active_period
+                ) AS cum_amt
+            FROM cells c
+            JOIN sizes s ON s.session_id = c.session_id AND s.first_period = c.first_period
+        )
+        SELECT session_id,
+            first_period AS {first_col},
+            active_period AS {active_col},
+            periods_since AS {since_col},
+            users,
+            cohort_num_users,
+            users * 1.0 / cohort_num_users AS retention_rate,
+            cum_amt,
+            cum_amt / cohort_num_users AS ltv
+        FROM cumulative
+        WHERE periods_since <= {max_periods}"""
+
+    return [growth, revenue, retention, revenue_retention, quick_ratio, revenue_quick_ratio, cohorts]
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite database defining the same views, for offline and single-node use"""
+
+    def __init__(self, path=":memory:"):
+        # Every thread reads through its own connection, so view reads run in parallel.
+        # An in-memory database is private to one connection (or, with a shared cache,
+        # serializes them again), so ":memory:" is a temporary file removed with the backend.
+        if path == ":memory:":
+            fd, path = tempfile.mkstemp(prefix="growth-calc-", suffix=".sqlite3")
+            os.close(fd)
+            weakref.finalize(self, _remove_database, path)
+        self.path = path
+        self.local = threading.local()
+        # Writers take turns; readers never wait for them in WAL mode
+        self.lock = threading.Lock()
+
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self.lock, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS revenue_data (
+                    session_id TEXT NOT NULL,
+                    transaction_date TEXT NOT NULL,
+                    transaction_id TEXT,
+                    revenue REAL,
+                    user_id TEXT NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS revenue_data_session_idx "
+                "ON revenue_data (session_id, user_id, transaction_date)"
+            )
+            for period in _SQLITE_PERIODS:
+                for ddl in _sqlite_view_ddl(period):
+                    conn.execute(ddl)
+
+    def connection(self):
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.path)
+        return conn
+
+    def ingest_chunks(self, chunks, session_id, job, on_progress=None):
+        position = 0
+        for frame in chunks:
+            chunk_start = position
+            position += len(frame)
+            for start, end in job.gaps(chunk_start, position):
+                self._insert(frame[start - chunk_start:end - chunk_start], session_id)
+                job.mark_done(start, end)
+                if on_progress:
+                    on_progress(job.stored)
+        job.total_rows = position
+        return position
+
+    def _insert(self, chunk, session_id):
+        rows = zip(
+            [session_id] * len(chunk),
+            iso_dates(chunk['date']),
+            text_or_null(chunk['id']),
+            chunk['revenue'].astype(float),
+            chunk['user_id'].astype(str)
+        )
+        # Each range commits in one transaction, so it is either stored or not
+        conn = self.connection()
+        with self.lock, conn:
+            conn.executemany(
+                "INSERT INTO revenue_data "
+                "(session_id, transaction_date, transaction_id, revenue, user_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def clear(self, session_id):
+        conn = self.connection()
+        with self.lock, conn:
+            cursor = conn.execute("DELETE FROM revenue_data WHERE session_id = ?", (session_id,))
+        return cursor.rowcount or None
+
+    def refresh_granularity(self, session_id, granularity):
+        # Plain views are computed on read, so there is nothing to wait for
+        return None
+
+    def read_view(self, view, session_id, start_date=None, end_date=None, cancelled=None):
+        check_cancelled(cancelled)
+        spec = VIEWS[view]
+        sql = f"SELECT {', '.join(spec.columns)} FROM {view} WHERE session_id = ?"
+        params = [session_id]
+
+        if start_date:
+            sql += f" AND {spec.date_column} >= ?"
+            params.append(start_date.strftime('%Y-%m-%d'))
+        if end_date:
+            sql += f" AND {spec.date_column} <= ?"
+            params.append(end_date.strftime('%Y-%m-%d'))
+
+        direction = " DESC" if spec.desc else ""
+        sql += " ORDER BY " + ", ".join(column + direction for column in spec.order)
+
+        frame = pd.read_sql_query(sql, self.connection(), params=params)
+        return typed_frame(view, frame)
+
+
+def _remove_database(path):
+    # The write-ahead log and shared-memory index live beside the database
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+# Backend selection: STORAGE_BACKEND=supabase (default) or sqlite, with SQLITE_PATH
+# pointing at a database file (in-memory when unset). SUPABASE_PAGINATION=keyset
+# switches Supabase view reads from concurrent offset pages to seek pagination, and
+# SUPABASE_WIRE_FORMAT=csv reads views as CSV documents instead of JSON rows.
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "supabase")
+
+
+@st.cache_resource
+def get_backend() -> StorageBackend:
+    """Process-wide storage backend chosen by STORAGE_BACKEND"""
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteBackend(os.environ.get("SQLITE_PATH", ":memory:"))
+    return SupabaseBackend(
+        os.environ.get("SUPABASE_PAGINATION", "offset"),
+        os.environ.get("SUPABASE_WIRE_FORMAT", "json")
+    )
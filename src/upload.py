@@ -0,0 +1,297 @@
+import csv
+import gzip
+import hashlib
+import io
+import zipfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import streamlit as st
+from cache import get_upload_cache
+from storage import iso_dates
+
+# Columns every upload must have; others are not read
+REQUIRED_COLUMNS = ['date', 'id', 'revenue', 'user_id']
+
+# Uploader file types; .gz, .zip and .zst files hold a compressed CSV
+UPLOAD_TYPES = ['csv', 'gz', 'zip', 'zst']
+# Largest CSV a compressed upload may expand to, so a small archive cannot expand without bound
+MAX_CSV_BYTES = 10 * 1024 * 1024 * 1024
+
+# Files whose CSV is larger than this, or of unknown size, are streamed in chunks
+# rather than parsed into one frame
+STREAMING_THRESHOLD_BYTES = 10 * 1024 * 1024
+# CSV bytes parsed per streamed chunk
+CHUNK_BYTES = 16 * 1024 * 1024
+# Bytes read to check the header and preview a streamed file
+HEAD_BYTES = 64 * 1024
+
+# Streamed chunks are typed up front so every chunk agrees with the first one
+_CHUNK_TYPES = {
+    'date': pa.string(), 'id': pa.string(), 'revenue': pa.float64(), 'user_id': pa.string()
+}
+# The same types for pandas' reader; blank cells are nulls either way
+_FRAME_TYPES = {'date': 'category', 'id': 'str', 'revenue': 'float64', 'user_id': 'category'}
+
+
+class UploadFormatError(ValueError):
+    """The file is not a CSV the app can use; the message is meant for the user"""
+
+
+def read_header(data):
+    """Column names on the first line of CSV bytes, without reading the body"""
+    end = data.find(b'\n')
+    first_line = data if end < 0 else data[:end]
+    return next(csv.reader([first_line.decode('utf-8-sig').rstrip('\r')]), [])
+
+
+class _LimitedReader:
+    """Read-only stream that fails once more than limit bytes have been read from it"""
+
+    def __init__(self, source, limit):
+        self.source = source
+        self.limit = limit
+        self.total = 0
+
+    def read(self, size=-1):
+        # pyarrow streams only read everything when given no size
+        data = self.source.read() if size is None or size < 0 else self.source.read(size)
+        self.total += len(data)
+        if self.total > self.limit:
+            raise UploadFormatError(
+                f"The CSV inside the file is larger than {self.limit // 2**30}GB"
+            )
+        return data
+
+
+class _KeepOpen:
+    """Read-only view of a file that stays open when the stream wrapping it is closed"""
+
+    closed = False
+
+    def __init__(self, source):
+        self.source = source
+
+    def read(self, size=-1):
+        return self.source.read(size)
+
+    def close(self):
+        pass
+
+
+def is_compressed(uploaded_file):
+    return not uploaded_file.name.lower().endswith('.csv')
+
+
+def _zip_member(archive):
+    """The one CSV file inside a ZIP archive"""
+    members = [
+        info for info in archive.infolist()
+        if info.filename.lower().endswith('.csv') and not info.filename.startswith('__MACOSX/')
+    ]
+    if len(members) != 1:
+        raise UploadFormatError("ZIP files must contain exactly one CSV file")
+    return members[0]
+
+
+def open_upload(uploaded_file):
+    """A new stream over the upload's CSV bytes, decompressing as it is read"""
+    uploaded_file.seek(0)
+    name = uploaded_file.name.lower()
+    if name.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=uploaded_file)
+    elif name.endswith('.zip'):
+        archive = zipfile.ZipFile(uploaded_file)
+        stream = archive.open(_zip_member(archive))
+    elif name.endswith('.zst'):
+        # pyarrow closes the file it decompresses, but reruns read the upload again
+        stream = pa.CompressedInputStream(_KeepOpen(uploaded_file), 'zstd')
+    else:
+        return uploaded_file
+    return _LimitedReader(stream, MAX_CSV_BYTES)
+
+
+def _zstd_content_size(header):
+    # Frame header: magic number, descriptor, window byte unless single segment,
+    # dictionary id, then the optional content size
+    if header[:4] != b'\x28\xb5\x2f\xfd' or len(header) < 5:
+        return None
+    descriptor = header[4]
+    single_segment = descriptor >> 5 & 1
+    size_bytes = [single_segment, 2, 4, 8][descriptor >> 6]
+    if size_bytes == 0:
+        return None
+    start = 5 + (1 - single_segment) + [0, 1, 2, 4][descriptor & 3]
+    size = int.from_bytes(header[start:start + size_bytes], 'little')
+    # Two-byte sizes are stored minus 256
+    return size + 256 if size_bytes == 2 else size
+
+
+def csv_size(uploaded_file):
+    """Size of the upload's CSV once decompressed, or None when the file does not say"""
+    name = uploaded_file.name.lower()
+    if name.endswith('.gz'):
+        # The gzip trailer holds the size modulo 4GB; less than the compressed size
+        # means it wrapped (or the file has several members), so it says nothing
+        uploaded_file.seek(-4, io.SEEK_END)
+        size = int.from_bytes(uploaded_file.read(4), 'little')
+        return size if size >= uploaded_file.size else None
+    if name.endswith('.zip'):
+        return _zip_member(zipfile.ZipFile(uploaded_file)).file_size
+    if name.endswith('.zst'):
+        uploaded_file.seek(0)
+        return _zstd_content_size(uploaded_file.read(18))
+    return uploaded_file.size
+
+
+def should_stream(uploaded_file):
+    """Whether to parse the upload chunk by chunk: its CSV is large or of unknown size"""
+    size = csv_size(uploaded_file)
+    return size is None or size > STREAMING_THRESHOLD_BYTES
+
+
+def read_head(source, size=HEAD_BYTES):
+    """First bytes of a stream (see open_upload)"""
+    return source.read(size)
+
+
+def missing_columns(data):
+    """Required columns the CSV's header lacks"""
+    header = read_header(data)
+    return [column for column in REQUIRED_COLUMNS if column not in header]
+
+
+def _encode(df):
+    """Compact a frame whose date and user_id are categoricals, in place.
+
+    Each distinct date string is parsed once and mapped back to its rows as int32 day
+    ordinals; revenue is made numeric. Rows without a date or user_id are rejected.
+    """
+    dates = df['date'].cat
+    codes = dates.codes.to_numpy()
+    if (codes < 0).any():
+        raise UploadFormatError(f"{int((codes < 0).sum()):,} rows have no date")
+    days = pd.to_datetime(dates.categories).to_numpy().astype('datetime64[D]').astype(np.int32)
+    df['date'] = days[codes]
+
+    missing_users = int(df['user_id'].isna().sum())
+    if missing_users:
+        raise UploadFormatError(f"{missing_users:,} rows have no user_id")
+
+    df['revenue'] = pd.to_numeric(df['revenue'])
+    return df
+
+
+def parse_csv(data):
+    """Parse uploaded CSV bytes into compact columns.
+
+    date becomes int32 day ordinals (days since 1970-01-01), user_id a categorical,
+    id a string and revenue a float, blank cells being nulls. The header is checked
+    before the body is read, which is parsed by pyarrow's multi-threaded reader. Each
+    distinct date string is parsed only once.
+    """
+    if missing_columns(data):
+        raise UploadFormatError(f"CSV must contain these columns: {', '.join(REQUIRED_COLUMNS)}")
+
+    df = pd.read_csv(
+        io.BytesIO(data),
+        engine="pyarrow",
+        usecols=REQUIRED_COLUMNS,
+        dtype=_FRAME_TYPES
+    )
+    return _encode(df)
+
+
+def _line_blocks(source, block_bytes):
+    """Blocks of about block_bytes from a file object, each ending at a line break"""
+    rest = b''
+    while True:
+        block = source.read(block_bytes)
+        if not block:
+            if rest:
+                yield rest
+            return
+
+        block = rest + block
+        end = block.rfind(b'\n') + 1
+        rest = block[end:]
+        if end:
+            yield block[:end]
+
+
+def iter_csv_chunks(source, chunk_bytes=CHUNK_BYTES):
+    """Parse a CSV file object lazily, yielding frames encoded like parse_csv's.
+
+    The file is read about chunk_bytes at a time, only as chunks are consumed, and
+    each chunk is parsed by pyarrow's multi-threaded reader, so memory stays flat
+    whatever the file's size. Check the header (read_head, missing_columns) first:
+    a bad value is only found when its chunk is reached.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        column_types=_CHUNK_TYPES, include_columns=REQUIRED_COLUMNS, strings_can_be_null=True
+    )
+    column_names = None
+
+    for block in _line_blocks(source, chunk_bytes):
+        # Only the first block has the header; name the others' columns after it
+        skip_rows = 0
+        if column_names is None:
+            column_names = read_header(block)
+            skip_rows = 1
+
+        table = pa_csv.read_csv(
+            pa.py_buffer(block),
+            read_options=pa_csv.ReadOptions(column_names=column_names, skip_rows=skip_rows),
+            convert_options=convert_options
+        )
+        if table.num_rows:
+            yield _encode(table.to_pandas(categories=['date', 'user_id']))
+
+
+def stream_fingerprint(uploaded_file, head):
+    """Identity of a streamed file from its name, size and first bytes, as it is not hashed whole"""
+    head_digest = hashlib.blake2b(head, digest_size=16).hexdigest()
+    return ("stream", uploaded_file.name, uploaded_file.size, head_digest)
+
+
+def estimate_rows(head, file_size):
+    """Rough row count of a file from the rows in its first bytes, None if its size is unknown"""
+    if file_size is None:
+        return None
+    rows_in_head = max(head.count(b'\n') - 1, 1)
+    return max(int(file_size * rows_in_head / max(len(head), 1)), 1)
+
+
+def preview_head(head, rows=5):
+    """Preview of a streamed file from its first bytes, without reading the rest"""
+    # Drop the partial last line
+    complete = head[:head.rfind(b'\n') + 1] or head
+    return preview(parse_csv(complete), rows)
+
+
+def preview(df, rows=5):
+    """First rows of a parsed upload with readable dates"""
+    head = df.head(rows)
+    return head.assign(date=iso_dates(head['date']))
+
+
+def read_upload(uploaded_file):
+    """Parsed frame of the session's uploaded file.
+
+    Reruns with the same file attached reuse the frame parsed the first time, keyed by
+    a hash of the file's bytes. Compressed files are decompressed whole, so only pass
+    files should_stream turns down. The frame is shared, so it must not be modified.
+    """
+    data = uploaded_file.getvalue()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    session_id = st.session_state.session_id
+
+    cache = get_upload_cache()
+    df = cache.get(session_id, digest)
+    if df is None:
+        if is_compressed(uploaded_file):
+            data = open_upload(uploaded_file).read()
+        df = parse_csv(data)
+        cache.put(session_id, digest, df)
+    return df
@@ -1,23 +1,12 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
-def plot_cohorts(data, period="month"):
-    if data.empty:
-        st.info("No data available for visualization. Please upload some data first.")
-        return
-    
-    df = pd.DataFrame(data)
-    
-    if df.empty:
+def plot_cohorts(cohorts, period="month"):
+    if cohorts is None or len(cohorts.cohorts) == 0:
         st.info("No data available for the selected date range.")
         return
     
-    # Convert retention rate to percentage
-    df['retention_rate'] = df['retention_rate'] * 100
-    
     # Add color scale range controls
     col1, col2 = st.columns(2)
     with col1:
@@ -39,54 +28,19 @@ def plot_cohorts(data, period="month"):
             key=f"retention_max_{period}"
         )
     
-    # Use appropriate column names based on period
-    if period == "month":
-        first_period = 'first_month'
-        periods_since = 'months_since_first'
-        max_periods = 24
-    elif period == "week":
-        first_period = 'first_week'
-        periods_since = 'weeks_since_first'
-        max_periods = 52
-    else:  # daily
-        first_period = 'first_dt'
-        periods_since = 'days_since_first'
-        max_periods = 90
-    
-    # Convert dates to datetime before pivot
-    df[first_period] = pd.to_datetime(df[first_period])
-    
-    # Sort the dataframe before pivot
-    df = df.sort_values(by=[first_period, periods_since])
-    
-    # Pivot the data for the heatmap
-    pivot_df = df.pivot(
-        index=first_period,
-        columns=periods_since,
-        values='retention_rate'
-    )
-    
-    # Sort index explicitly
-    pivot_df.index = pd.to_datetime(pivot_df.index)
-    pivot_df = pivot_df.sort_index(ascending=True)
-    
-    # Limit to appropriate number of periods
-    pivot_df = pivot_df.loc[:, pivot_df.columns <= max_periods]
+    # Matrix is already capped at the period's max periods and sorted by cohort
+    retention = cohorts.retention * 100
+    x_periods = np.arange(retention.shape[1])
     
     # Format dates for display
-    y_dates = pivot_df.index.strftime('%Y-%m-%d')
+    y_dates = cohorts.cohorts.strftime('%Y-%m-%d')
     
     # Create text array with proper formatting
-    text_array = []
-    for row in pivot_df.values:
-        text_row = []
-        for val in row:
-            if np.isnan(val):
-                text_row.append("")
-            else:
-                text_row.append(f"{val:.1f}%")
-        text_array.append(text_row)
-    text_array = np.array(text_array)
+    text_array = np.where(
+        np.isnan(retention),
+        "",
+        np.char.add(np.char.mod("%.1f", np.nan_to_num(retention)), "%")
+    )
     
     # Adjust text size and format based on period
     text_size = 10 if period == "month" else 8
@@ -101,8 +55,8 @@ def plot_cohorts(data, period="month"):
     
     # Create heatmap
     fig = go.Figure(data=go.Heatmap(
-        z=pivot_df.values,
-        x=pivot_df.columns,
+        z=retention,
+        x=x_periods,
         y=y_dates,  # Use formatted dates
         colorscale='RdYlBu',
         text=text_array,
@@ -165,24 +119,10 @@ def plot_cohorts(data, period="month"):
     # Show raw data in expandable section
     with st.expander("Show Raw Data"):
         st.subheader("Retention Rates (%)")
-        st.dataframe(pivot_df)
-        
-        # Create pivot table for cohort sizes
-        cohort_sizes_df = df.pivot(
-            index=first_period,
-            columns=periods_since,
-            values='cohort_num_users'
-        ).sort_index(ascending=True)
+        st.dataframe(cohorts.frame(retention))
         
         st.subheader("Cohort Sizes (Number of Users at Start)")
-        st.dataframe(cohort_sizes_df)
-        
-        # Create pivot table for active users
-        active_users_df = df.pivot(
-            index=first_period,
-            columns=periods_since,
-            values='users'
-        ).sort_index(ascending=True)
+        st.dataframe(cohorts.frame(cohorts.sizes))
         
         st.subheader("Active Users Over Time")
-        st.dataframe(active_users_df) 
\ No newline at end of file
+        st.dataframe(cohorts.frame(cohorts.users)) 
\ No newline at end of file
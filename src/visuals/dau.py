@@ -1,19 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from storage import VIEWS
 
-def plot_dau(data):
-    if data.empty:
+def plot_dau(df):
+    if df.empty:
         st.info("No data available for visualization. Please upload some data first.")
         return
     
-    df = pd.DataFrame(data)
-    
     # Create figure with all DAU components
     fig = px.line(
         df,
         x='day',
-        y=['dau', 'new', 'retained', 'resurrected', 'churned'],
+        y=VIEWS['dau_view'].columns[1:],
         markers=True
     )
     
@@ -62,16 +60,16 @@ def plot_dau(data):
     
     # Add raw data section in an expander
     with st.expander("Show Raw Data"):
+        # Format a copy, the frame is shared with the other charts
+        df = df.copy()
+        
         # Format the date column
-        df['day'] = pd.to_datetime(df['day']).dt.strftime('%Y-%m-%d')
+        df['day'] = df['day'].dt.strftime('%Y-%m-%d')
         
         # Format numeric columns
-        numeric_cols = ['dau', 'new', 'retained', 'resurrected', 'churned']
+        numeric_cols = VIEWS['dau_view'].columns[1:]
         df[numeric_cols] = df[numeric_cols].round(0)
         
-        # Drop session_id column
-        df = df.drop(columns=['session_id'])
-        
         # Display the dataframe
         st.dataframe(
             df,
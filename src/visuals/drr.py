@@ -1,23 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from storage import VIEWS
 
-def plot_drr(data):
-    if data.empty:
-        st.info("No data available for visualization. Please upload some data first.")
-        return
-    
-    df = pd.DataFrame(data)
-    
+def plot_drr(df):
     if df.empty:
-        st.info("No data available for the selected date range.")
+        st.info("No data available for visualization. Please upload some data first.")
         return
     
     # Create figure with all DRR components
     fig = px.line(
         df,
         x='day',
-        y=['rev', 'retained', 'new', 'expansion', 'resurrected', 'contraction', 'churned'],
+        y=VIEWS['drr_view'].columns[1:],
         markers=True
     )
     
@@ -70,16 +64,16 @@ def plot_drr(data):
     
     # Add raw data section in an expander
     with st.expander("Show Raw Data"):
+        # Format a copy, the frame is shared with the other charts
+        df = df.copy()
+        
         # Format the date column
-        df['day'] = pd.to_datetime(df['day']).dt.strftime('%Y-%m-%d')
+        df['day'] = df['day'].dt.strftime('%Y-%m-%d')
         
         # Format numeric columns
-        numeric_cols = ['rev', 'retained', 'new', 'expansion', 'resurrected', 'contraction', 'churned']
+        numeric_cols = VIEWS['drr_view'].columns[1:]
         df[numeric_cols] = df[numeric_cols].round(2)
         
-        # Drop session_id column
-        df = df.drop(columns=['session_id'])
-        
         # Display the dataframe with currency formatting
         st.dataframe(
             df,
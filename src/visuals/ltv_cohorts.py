@@ -1,24 +1,18 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
-def plot_ltv_cohorts(data, period="month"):
-    if data.empty:
-        st.info("No data available for visualization. Please upload some data first.")
-        return
-    
-    df = pd.DataFrame(data)
-    
-    if df.empty:
+def plot_ltv_cohorts(cohorts, period="month"):
+    if cohorts is None or len(cohorts.cohorts) == 0:
         st.info("No data available for the selected date range.")
         return
     
+    ltv = cohorts.ltv
+    
     # Add color scale range controls
     col1, col2 = st.columns(2)
     with col1:
-        suggested_min = max(0, df['ltv'].min() * 0.9)  # 10% lower than min value, but not below 0
+        suggested_min = max(0, np.nanmin(ltv) * 0.9)  # 10% lower than min value, but not below 0
         min_value = st.number_input(
             "Heatmap Min. LTV ($)", 
             value=float(suggested_min),
@@ -27,7 +21,7 @@ def plot_ltv_cohorts(data, period="month"):
             key="ltv_min"
         )
     with col2:
-        suggested_max = df['ltv'].max() * 1.1  # 10% higher than max value
+        suggested_max = np.nanmax(ltv) * 1.1  # 10% higher than max value
         max_value = st.number_input(
             "Heatmap Max. LTV ($)", 
             value=float(suggested_max),
@@ -36,41 +30,15 @@ def plot_ltv_cohorts(data, period="month"):
             key="ltv_max"
         )
     
-    # Use appropriate column names based on period
-    if period == "month":
-        first_period = 'first_month'
-        periods_since = 'months_since_first'
-        max_periods = 24
-    elif period == "week":
-        first_period = 'first_week'
-        periods_since = 'weeks_since_first'
-        max_periods = 52
-    else:  # daily
-        first_period = 'first_dt'
-        periods_since = 'days_since_first'
-        max_periods = 90
-    
-    # Pivot the data for the heatmap
-    pivot_df = df.pivot(
-        index=first_period,
-        columns=periods_since,
-        values='ltv'
-    ).sort_index(ascending=True)
-    
-    # Limit to appropriate number of periods
-    pivot_df = pivot_df.loc[:, pivot_df.columns <= max_periods]
+    # Matrix is already capped at the period's max periods and sorted by cohort
+    x_periods = np.arange(ltv.shape[1])
     
     # Create text array with proper formatting
-    text_array = []
-    for row in pivot_df.values:
-        text_row = []
-        for val in row:
-            if np.isnan(val):
-                text_row.append("")
-            else:
-                text_row.append(f"${val:.2f}")
-        text_array.append(text_row)
-    text_array = np.array(text_array)
+    text_array = np.where(
+        np.isnan(ltv),
+        "",
+        np.char.add("$", np.char.mod("%.2f", np.nan_to_num(ltv)))
+    )
     
     # Adjust text size and format based on period
     text_size = 10 if period == "month" else 8
@@ -84,12 +52,12 @@ def plot_ltv_cohorts(data, period="month"):
     }[period]
     
     # Format dates without time
-    y_dates = pd.to_datetime(pivot_df.index).strftime('%Y-%m-%d')
+    y_dates = cohorts.cohorts.strftime('%Y-%m-%d')
     
     # Create heatmap
     fig = go.Figure(data=go.Heatmap(
-        z=pivot_df.values,
-        x=pivot_df.columns,
+        z=ltv,
+        x=x_periods,
         y=y_dates,  # Use formatted dates
         colorscale='RdYlBu',
         text=text_array,
@@ -152,24 +120,10 @@ def plot_ltv_cohorts(data, period="month"):
     # Show raw data in expandable section
     with st.expander("Show Raw Data"):
         st.subheader("LTV Values ($)")
-        st.dataframe(pivot_df)
-        
-        # Create pivot table for cumulative revenue
-        cum_revenue_df = df.pivot(
-            index=first_period,
-            columns=periods_since,
-            values='cum_amt'
-        ).sort_index(ascending=True)
+        st.dataframe(cohorts.frame(ltv))
         
         st.subheader("Cumulative Revenue Over Time ($)")
-        st.dataframe(cum_revenue_df)
-        
-        # Create pivot table for cohort sizes
-        cohort_sizes_df = df.pivot(
-            index=first_period,
-            columns=periods_since,
-            values='cohort_num_users'
-        ).sort_index(ascending=True)
+        st.dataframe(cohorts.frame(cohorts.cum_amt))
         
         st.subheader("Cohort Sizes (Number of Users)")
-        st.dataframe(cohort_sizes_df) 
\ No newline at end of file
+        st.dataframe(cohorts.frame(cohorts.sizes))
\ No newline at end of file
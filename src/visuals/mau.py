@@ -1,19 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from storage import VIEWS
 
-def plot_mau(data):
-    if data.empty:
+def plot_mau(df):
+    if df.empty:
         st.info("No data available for visualization. Please upload some data first.")
         return
     
-    df = pd.DataFrame(data)
-    
     # Create figure with all MAU components
     fig = px.line(
         df,
         x='month',
-        y=['mau', 'new', 'retained', 'resurrected', 'churned'],
+        y=VIEWS['mau_view'].columns[1:],
         markers=True
     )
     
@@ -62,16 +60,16 @@ def plot_mau(data):
     
     # Add raw data section in an expander
     with st.expander("Show Raw Data"):
+        # Format a copy, the frame is shared with the other charts
+        df = df.copy()
+        
         # Format the date column
-        df['month'] = pd.to_datetime(df['month']).dt.strftime('%Y-%m')
+        df['month'] = df['month'].dt.strftime('%Y-%m')
         
         # Format numeric columns
-        numeric_cols = ['mau', 'new', 'retained', 'resurrected', 'churned']
+        numeric_cols = VIEWS['mau_view'].columns[1:]
         df[numeric_cols] = df[numeric_cols].round(0)
         
-        # Drop session_id column
-        df = df.drop(columns=['session_id'])
-        
         # Display the dataframe
         st.dataframe(
             df,
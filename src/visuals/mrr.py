@@ -1,19 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from storage import VIEWS
 
-def plot_mrr(data):
-    if data.empty:
+def plot_mrr(df):
+    if df.empty:
         st.info("No data available for visualization. Please upload some data first.")
         return
     
-    df = pd.DataFrame(data)
-    
     # Create figure with all MRR components
     fig = px.line(
         df,
         x='month',
-        y=['rev', 'retained', 'new', 'expansion', 'resurrected', 'contraction', 'churned'],
+        y=VIEWS['mrr_view'].columns[1:],
         markers=True
     )
     
@@ -66,16 +64,16 @@ def plot_mrr(data):
     
     # Add raw data section in an expander
     with st.expander("Show Raw Data"):
+        # Format a copy, the frame is shared with the other charts
+        df = df.copy()
+        
         # Format the date column
-        df['month'] = pd.to_datetime(df['month']).dt.strftime('%Y-%m')
+        df['month'] = df['month'].dt.strftime('%Y-%m')
         
         # Format numeric columns
-        numeric_cols = ['rev', 'retained', 'new', 'expansion', 'resurrected', 'contraction', 'churned']
+        numeric_cols = VIEWS['mrr_view'].columns[1:]
         df[numeric_cols] = df[numeric_cols].round(2)
         
-        # Drop session_id column
-        df = df.drop(columns=['session_id'])
-        
         # Display the dataframe with currency formatting
         st.dataframe(
             df,
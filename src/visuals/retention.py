@@ -1,17 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-def plot_retention_rates(data, period_type):
-    if data.empty:
-        st.info("No data available for visualization. Please upload some data first.")
-        return
-    
-    df = pd.DataFrame(data)
-    
+def plot_retention_rates(df, period_type):
     if df.empty:
-        st.info("No data available for the selected date range.")
+        st.info("No data available for visualization. Please upload some data first.")
         return
     
     time_column = period_type  # 'month' or 'week' or 'day'
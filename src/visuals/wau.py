@@ -1,19 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from storage import VIEWS
 
-def plot_wau(data):
-    if data.empty:
+def plot_wau(df):
+    if df.empty:
         st.info("No data available for visualization. Please upload some data first.")
         return
     
-    df = pd.DataFrame(data)
-    
     # Create figure with all WAU components
     fig = px.line(
         df,
         x='week',
-        y=['wau', 'new', 'retained', 'resurrected', 'churned'],
+        y=VIEWS['wau_view'].columns[1:],
         markers=True
     )
     
@@ -62,16 +60,16 @@ def plot_wau(data):
     
     # Add raw data section in an expander
     with st.expander("Show Raw Data"):
+        # Format a copy, the frame is shared with the other charts
+        df = df.copy()
+        
         # Format the date column
-        df['week'] = pd.to_datetime(df['week']).dt.strftime('%Y-%m-%d')
+        df['week'] = df['week'].dt.strftime('%Y-%m-%d')
         
         # Format numeric columns
-        numeric_cols = ['wau', 'new', 'retained', 'resurrected', 'churned']
+        numeric_cols = VIEWS['wau_view'].columns[1:]
         df[numeric_cols] = df[numeric_cols].round(0)
         
-        # Drop session_id column
-        df = df.drop(columns=['session_id'])
-        
         # Display the dataframe
         st.dataframe(
             df,
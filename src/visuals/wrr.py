@@ -1,19 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from storage import VIEWS
 
-def plot_wrr(data):
-    if data.empty:
+def plot_wrr(df):
+    if df.empty:
         st.info("No data available for visualization. Please upload some data first.")
         return
     
-    df = pd.DataFrame(data)
-    
     # Create figure with all WRR components
     fig = px.line(
         df,
         x='week',
-        y=['rev', 'retained', 'new', 'expansion', 'resurrected', 'contraction', 'churned'],
+        y=VIEWS['wrr_view'].columns[1:],
         markers=True
     )
     
@@ -66,16 +64,16 @@ def plot_wrr(data):
     
     # Add raw data section in an expander
     with st.expander("Show Raw Data"):
+        # Format a copy, the frame is shared with the other charts
+        df = df.copy()
+        
         # Format the date column
-        df['week'] = pd.to_datetime(df['week']).dt.strftime('%Y-%m-%d')
+        df['week'] = df['week'].dt.strftime('%Y-%m-%d')
         
         # Format numeric columns
-        numeric_cols = ['rev', 'retained', 'new', 'expansion', 'resurrected', 'contraction', 'churned']
+        numeric_cols = VIEWS['wrr_view'].columns[1:]
         df[numeric_cols] = df[numeric_cols].round(2)
         
-        # Drop session_id column
-        df = df.drop(columns=['session_id'])
-        
         # Display the dataframe with currency formatting
         st.dataframe(
             df,
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its modules from src/, as `streamlit run src/app.py` does
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
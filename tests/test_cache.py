@@ -0,0 +1,66 @@
+"""Reads in flight across an invalidation must not repopulate the cache"""
+import datetime
+import threading
+
+import pandas as pd
+import pytest
+
+from cache import ResultCache, cached_range, read_range
+from storage import ReadCancelled, SQLiteBackend, typed_frame
+
+
+class InvalidatingBackend:
+    """Backend whose read races with the session's data being replaced"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def read_view(self, view, session_id, start_date=None, end_date=None, cancelled=None):
+        self.cache.invalidate(session_id)
+        return pd.DataFrame({"month": pd.to_datetime(["2024-01-01"]), "mau": [1]})
+
+
+def test_read_across_invalidate_is_not_cached():
+    cache = ResultCache()
+    frame = read_range(InvalidatingBackend(cache), cache, "mau_view", "session")
+
+    assert len(frame) == 1
+    assert cached_range(cache, "mau_view", "session") is None
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = ResultCache()
+    generation = cache.generation("session")
+    cache.invalidate("session")
+    cache.put(("session", "mau_view"), "stale", generation)
+    assert cache.get(("session", "mau_view")) is None
+
+    cache.put(("session", "mau_view"), "fresh", cache.generation("session"))
+    assert cache.get(("session", "mau_view")) == "fresh"
+
+
+def test_cancelled_read_stops_before_querying():
+    cache = ResultCache()
+    cancelled = threading.Event()
+    cancelled.set()
+
+    with pytest.raises(ReadCancelled):
+        read_range(SQLiteBackend(), cache, "mau_view", "session", cancelled=cancelled)
+    assert cached_range(cache, "mau_view", "session") is None
+
+
+class ZonedBackend:
+    """Backend whose view reports timestamptz dates"""
+
+    def read_view(self, view, session_id, start_date=None, end_date=None, cancelled=None):
+        return typed_frame(view, pd.DataFrame({
+            "month": ["2024-01-01T00:00:00+00:00", "2024-02-01T00:00:00+00:00"],
+            "mau": [1, 2], "new": [1, 1], "retained": [0, 1], "resurrected": [0, 0], "churned": [0, 0],
+        }))
+
+
+def test_zoned_dates_are_read_as_naive():
+    frame = read_range(ZonedBackend(), ResultCache(), "mau_view", "session", datetime.date(2024, 2, 1))
+
+    assert frame["month"].dtype == "datetime64[ns]"
+    assert frame["month"].tolist() == [pd.Timestamp("2024-02-01")]
@@ -0,0 +1,73 @@
+"""Period data computed from the upload must match what the views return"""
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from database import PERIOD_UNITS, PERIOD_VIEWS, LocalPeriodSource
+from engine import cohort_matrix_from_rows
+from storage import SQLiteBackend
+from upload import parse_csv
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "2024_template_unit_economics.csv")
+
+# Unbounded, a range inside the data and one starting mid-period
+RANGES = [
+    (None, None),
+    (datetime.date(2024, 3, 1), datetime.date(2024, 9, 30)),
+    (datetime.date(2024, 6, 15), None),
+]
+
+
+@pytest.fixture(scope="module")
+def upload():
+    with open(TEMPLATE, "rb") as f:
+        return parse_csv(f.read())
+
+
+@pytest.fixture(scope="module")
+def backend(upload):
+    backend = SQLiteBackend()
+    backend.ingest(upload, "session")
+    return backend
+
+
+@pytest.mark.parametrize("period", list(PERIOD_VIEWS))
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_local_entries_match_views(upload, backend, period, start_date, end_date):
+    frames, _ = LocalPeriodSource(upload).read(period, start_date, end_date)
+    assert frames
+
+    for key, frame in frames.items():
+        expected = backend.read_view(PERIOD_VIEWS[period][key], "session", start_date, end_date)
+        pd.testing.assert_frame_equal(frame, expected, check_exact=False, obj=f"{period} {key}")
+
+
+@pytest.mark.parametrize("period", list(PERIOD_VIEWS))
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_local_cohorts_match_views(upload, backend, period, start_date, end_date):
+    _, matrix = LocalPeriodSource(upload).read(period, start_date, end_date)
+    rows = backend.read_view(PERIOD_VIEWS[period]["cohorts_results"], "session", start_date, end_date)
+    expected = cohort_matrix_from_rows(rows, PERIOD_UNITS[period])
+
+    pd.testing.assert_index_equal(pd.DatetimeIndex(matrix.cohorts), pd.DatetimeIndex(expected.cohorts))
+    np.testing.assert_allclose(matrix.cohort_size, expected.cohort_size)
+    np.testing.assert_allclose(matrix.users, expected.users)
+    np.testing.assert_allclose(matrix.cum_amt, expected.cum_amt)
+
+
+def test_rows_without_user_are_left_out_of_cohorts():
+    upload = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-05", "2024-02-05", "2024-01-10", "2024-03-05", "2024-04-05"]),
+        "id": ["1", "2", "3", "4", "5"],
+        "revenue": [10.0, 10.0, 5.0, 20.0, 20.0],
+        "user_id": ["a", "a", None, "b", "b"],
+    })
+    _, matrix = LocalPeriodSource(upload).read("Monthly")
+
+    np.testing.assert_array_equal(matrix.cohort_size, [1, 1])
+    # a is active in its first two months only, b from March
+    np.testing.assert_array_equal(matrix.users[0], [1, 1])
+    np.testing.assert_array_equal(matrix.users[1], [1, 1])
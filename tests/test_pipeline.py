@@ -0,0 +1,52 @@
+"""A streamed upload runs as one pipeline and a retry sends only the rows not stored"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from storage import AIMDController, UploadJob, pipelined_upload, row_batches
+
+CHUNK_ROWS = [70, 70, 70, 40]
+
+
+def chunks():
+    start = 0
+    for rows in CHUNK_ROWS:
+        yield pd.DataFrame({"row": range(start, start + rows)})
+        start += rows
+
+
+def controller():
+    return AIMDController(25, min_batch=5, max_batch=100, batch_step=5, cooldown=0.0, max_cooldown=0.0)
+
+
+def upload(job, write):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        ctrl = controller()
+        pipelined_upload(write, row_batches(chunks(), job, ctrl), job, executor, ctrl, max_attempts=2)
+
+
+def test_retry_resumes_by_row_position():
+    written = []
+
+    def failing(start, batch):
+        # The third chunk cannot be stored on the first attempt
+        if batch["row"].iloc[-1] >= 140:
+            raise ConnectionError("connection reset")
+        assert batch["row"].iloc[0] == start
+        written.extend(batch["row"])
+
+    job = UploadJob(("stream", "file.csv"))
+    with pytest.raises(Exception, match="Upload stopped at rows"):
+        upload(job, failing)
+    assert sorted(written) == list(range(140))
+    assert job.stored == 140
+
+    def working(start, batch):
+        assert batch["row"].iloc[0] == start
+        written.extend(batch["row"])
+
+    upload(job, working)
+    # Each row was sent once across both runs
+    assert sorted(written) == list(range(sum(CHUNK_ROWS)))
+    assert job.total_rows == sum(CHUNK_ROWS) and job.complete
@@ -0,0 +1,64 @@
+"""Both CSV readers must give the same compact frame, blank cells included"""
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from storage import decode_csv, text_or_null
+from upload import STREAMING_THRESHOLD_BYTES, UploadFormatError, iter_csv_chunks, parse_csv, should_stream
+
+BLANKS = b"date,id,revenue,user_id\n2024-01-01,1,,u\n2024-01-02,,5.5,v\n2024-01-02,3,2,v\n"
+
+
+def test_blank_cells_are_nulls():
+    df = parse_csv(BLANKS)
+
+    assert df['id'].isna().tolist() == [False, True, False]
+    assert df['revenue'].isna().tolist() == [True, False, False]
+    assert df['revenue'].dtype == 'float64'
+
+
+def test_chunks_match_parse_csv():
+    chunks = list(iter_csv_chunks(io.BytesIO(BLANKS)))
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), parse_csv(BLANKS))
+
+
+def test_blank_cells_are_sent_as_nulls():
+    df = parse_csv(BLANKS)
+
+    assert text_or_null(df['id']) == ['1', None, '3']
+    assert text_or_null(df['revenue']) == [None, '5.5', '2.0']
+
+
+def test_rows_without_user_are_rejected():
+    with pytest.raises(UploadFormatError, match="1 rows have no user_id"):
+        parse_csv(b"date,id,revenue,user_id\n2024-01-01,1,2,a\n2024-01-02,2,3,\n")
+
+
+class Uploaded(io.BytesIO):
+    """The parts of Streamlit's UploadedFile the upload helpers use"""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def test_only_large_csvs_are_streamed():
+    small = BLANKS
+    large = BLANKS + b"2024-01-03,4,1,w\n" * (STREAMING_THRESHOLD_BYTES // 16)
+
+    assert not should_stream(Uploaded(gzip.compress(small), "small.csv.gz"))
+    assert should_stream(Uploaded(gzip.compress(large), "large.csv.gz"))
+    assert not should_stream(Uploaded(small, "small.csv"))
+
+
+def test_csv_view_reads_keep_text_columns_as_written():
+    text = 'transaction_date,transaction_id,revenue,user_id\n"2024-01-01","00012","5","007"\n"2024-01-02",,,"NA"\n'
+    frame = decode_csv(text, "revenue_data")
+
+    assert frame["transaction_id"].tolist()[0] == "00012"
+    assert pd.isna(frame["transaction_id"].tolist()[1])
+    assert frame["user_id"].tolist() == ["007", "NA"]
+    assert frame["revenue"].isna().tolist() == [False, True]